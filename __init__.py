@@ -39,7 +39,7 @@ from bpy.types import Scene, Keyframe
 from bpy.utils import register_class, unregister_class
 
 # Addon import
-from .functions import app_handlers, general, property_callbacks, timers
+from .functions import app_handlers, general, preset_registry, property_callbacks
 from .lib.classes_to_register import classes
 from .lib import property_groups
 
@@ -56,7 +56,7 @@ def register():
     Scene.anim_preset_to_delete = EnumProperty(
         name="Preset to Delete",
         description="Another list of stored AssemblMe presets",
-        items=general.get_preset_tuples,
+        items=preset_registry.get_preset_tuples,
     )
 
     Scene.assemblme = PointerProperty(type=property_groups.AssemblMeProperties)
@@ -66,8 +66,12 @@ def register():
     Scene.aglist_index = IntProperty(default=-1, update=property_callbacks.ag_update)
 
     # register app handlers
-    bpy.app.handlers.load_post.append(timers.register_assemblme_timers)
-    bpy.app.timers.register(timers.handle_selections)
+    bpy.app.handlers.load_post.append(app_handlers.subscribe_to_active_object)
+    app_handlers.subscribe_to_active_object()
+    bpy.app.handlers.depsgraph_update_post.append(app_handlers.handle_collection_changes)
+    bpy.app.handlers.undo_post.append(app_handlers.handle_collection_changes)
+    bpy.app.handlers.redo_post.append(app_handlers.handle_collection_changes)
+    bpy.app.handlers.load_post.append(app_handlers.handle_collection_changes)
     bpy.app.handlers.load_post.append(app_handlers.convert_velocity_value)
     # bpy.app.handlers.load_pre.append(app_handlers.validate_assemblme)
     bpy.app.handlers.load_post.append(app_handlers.handle_upconversion)
@@ -78,9 +82,12 @@ def unregister():
     bpy.app.handlers.load_post.remove(app_handlers.handle_upconversion)
     # bpy.app.handlers.load_pre.remove(app_handlers.validate_assemblme)
     bpy.app.handlers.load_post.remove(app_handlers.convert_velocity_value)
-    if bpy.app.timers.is_registered(timers.handle_selections):
-        bpy.app.timers.unregister(timers.handle_selections)
-    bpy.app.handlers.load_post.remove(timers.register_assemblme_timers)
+    bpy.app.handlers.load_post.remove(app_handlers.handle_collection_changes)
+    bpy.app.handlers.redo_post.remove(app_handlers.handle_collection_changes)
+    bpy.app.handlers.undo_post.remove(app_handlers.handle_collection_changes)
+    bpy.app.handlers.depsgraph_update_post.remove(app_handlers.handle_collection_changes)
+    app_handlers.unsubscribe_from_active_object()
+    bpy.app.handlers.load_post.remove(app_handlers.subscribe_to_active_object)
 
     del Scene.aglist_index
     del Scene.aglist
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+# Author: Christopher Gearhart
+
+# System imports
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import tempfile
+import traceback
+from os.path import join, basename, dirname, realpath, abspath, isfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# TO RUN: blender -b -P batch-build.py -- path/to/*.blend --summary summary.json
+#     OR: python batch-build.py --blender path/to/blender path/to/*.blend --jobs 4
+# NOTE: each .blend file is rebuilt in its own background Blender process (with AssemblMe enabled)
+
+
+# helper functions
+def get_script_args():
+    """ returns arguments passed to this script (after '--' when run by Blender) """
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1:]
+    return [] if running_in_blender() else sys.argv[1:]
+
+
+def running_in_blender():
+    try:
+        import bpy
+    except ImportError:
+        return False
+    return True
+
+
+def get_addon_directory():
+    return dirname(realpath(__file__))
+
+
+def parse_args(argv:list):
+    parser = argparse.ArgumentParser(description="Rebuild AssemblMe animations in many .blend files")
+    parser.add_argument(
+        "files",
+        help="Blend files to rebuild",
+        nargs="*",
+    )
+    parser.add_argument(
+        "--manifest",
+        help="JSON file with a list of jobs: {\"file\": ..., \"animations\": [...], \"preset\": ...}",
+        dest="manifest",
+    )
+    parser.add_argument(
+        "--animation",
+        help="Name of AssemblMe animation to rebuild (may be repeated; default: all)",
+        dest="animations",
+        action="append",
+        default=None,
+    )
+    parser.add_argument(
+        "--preset",
+        help="Apply this AssemblMe preset before rebuilding",
+        dest="preset",
+    )
+    parser.add_argument(
+        "--jobs",
+        help="Number of Blender processes to run at once",
+        dest="jobs",
+        type=int,
+        default=max(1, (os.cpu_count() or 2) // 2),
+    )
+    parser.add_argument(
+        "--blender",
+        help="Path to the Blender executable (defaults to the running Blender)",
+        dest="blender",
+    )
+    parser.add_argument(
+        "--addon",
+        help="Module name AssemblMe is installed as",
+        dest="addon",
+        default=basename(get_addon_directory()),
+    )
+    parser.add_argument(
+        "--summary",
+        help="Write JSON summary of timings to this file (default: stdout)",
+        dest="summary",
+    )
+    parser.add_argument(
+        "--timeout",
+        help="Seconds before a file's Blender process is killed",
+        dest="timeout",
+        type=float,
+        default=None,
+    )
+    parser.add_argument(
+        "--no-save",
+        help="Rebuild without saving the files",
+        dest="save",
+        action="store_false",
+    )
+    # internal: set on the Blender processes started for each file
+    parser.add_argument("--worker", dest="worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result", dest="result", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def get_jobs(args):
+    """ returns list of jobs from the command line files and the manifest """
+    jobs = [{"file": f, "animations": args.animations, "preset": args.preset} for f in args.files]
+    if args.manifest:
+        with open(args.manifest, "r") as f:
+            manifest = json.load(f)
+        for job in manifest:
+            jobs.append({
+                "file": job["file"],
+                "animations": job.get("animations", args.animations),
+                "preset": job.get("preset", args.preset),
+            })
+    for job in jobs:
+        job["file"] = abspath(job["file"])
+    return jobs
+
+
+# controller: fan files out to a pool of background Blender processes
+def run_job(job:dict, args):
+    result_path = join(tempfile.mkdtemp(prefix="assemblme_batch_"), "result.json")
+    cmd = [args.blender, "--background", job["file"], "--python-exit-code", "1", "--python", realpath(__file__), "--", "--worker", "--result", result_path, "--addon", args.addon]
+    for name in job["animations"] or []:
+        cmd += ["--animation", name]
+    if job["preset"]:
+        cmd += ["--preset", job["preset"]]
+    if not args.save:
+        cmd.append("--no-save")
+
+    summary = {"file": job["file"], "status": "FAILED", "animations": []}
+    start_time = time.time()
+    try:
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, timeout=args.timeout)
+        summary["returncode"] = proc.returncode
+        if proc.returncode != 0:
+            summary["log"] = proc.stdout[-4000:]
+    except subprocess.TimeoutExpired:
+        summary["error"] = "Timed out after %(timeout)s seconds" % {"timeout": args.timeout}
+    summary["wall_time"] = time.time() - start_time
+    # merge in what the worker recorded
+    if isfile(result_path):
+        with open(result_path, "r") as f:
+            summary.update(json.load(f))
+        os.remove(result_path)
+    os.rmdir(dirname(result_path))
+    if summary.get("returncode", 0) != 0:
+        summary["status"] = "FAILED"
+    return summary
+
+
+def run_jobs(args):
+    if args.blender is None:
+        if not running_in_blender():
+            print("Pass '--blender' when running outside of Blender")
+            return 1
+        import bpy
+        args.blender = bpy.app.binary_path
+    jobs = get_jobs(args)
+    if len(jobs) == 0:
+        print("No files to rebuild")
+        return 1
+    start_time = time.time()
+    results = [None] * len(jobs)
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        futures = {executor.submit(run_job, job, args): i for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            result = future.result()
+            print("[%(status)s] %(file)s (%(wall_time).2fs)" % result)
+            results[futures[future]] = result
+    summary = {
+        "blender": args.blender,
+        "jobs": args.jobs,
+        "total_time": time.time() - start_time,
+        "num_failed": sum(r["status"] != "OK" for r in results),
+        "files": results,
+    }
+    if args.summary:
+        with open(args.summary, "w") as f:
+            json.dump(summary, f, indent=2)
+    else:
+        print(json.dumps(summary, indent=2))
+    return 1 if summary["num_failed"] > 0 else 0
+
+
+# worker: rebuild animations in the currently open .blend file
+def enable_addon(module_name:str):
+    import bpy
+    import addon_utils
+    if not hasattr(bpy.types.Scene, "aglist"):
+        addon_utils.enable(module_name, default_set=False, handle_error=None)
+    return sys.modules[module_name]
+
+
+def rebuild_animation(scn, ag_idx:int, preset:str):
+    """ rebuilds animation at aglist[ag_idx], returning its timing info """
+    import bpy
+    ag = scn.aglist[ag_idx]
+    info = {"scene": scn.name, "name": ag.name, "status": "FAILED"}
+    start_time = time.time()
+    with bpy.context.temp_override(scene=scn):
+        scn.aglist_index = ag_idx
+        if preset:
+            try:
+                ag.anim_preset = preset
+            except TypeError:
+                # not one of the preset enum items
+                pass
+        if preset and ag.anim_preset != preset:
+            # missing or invalid presets are reset to "None" instead of raising
+            info["error"] = "Preset '%(preset)s' could not be applied" % locals()
+        elif ag.collection is None:
+            info["error"] = "No collection specified"
+        else:
+            info["num_objects"] = len(ag.collection.all_objects)
+            result = bpy.ops.assemblme.create_build_animation()
+            info["status"] = "OK" if "FINISHED" in result else "CANCELLED"
+            info["anim_length"] = ag.anim_length
+    info["time"] = time.time() - start_time
+    return info
+
+
+def build_animations(args):
+    import bpy
+    result = {"status": "FAILED", "animations": []}
+    try:
+        addon = enable_addon(args.addon)
+        if args.preset:
+            # default presets are only copied to the presets folder from the UI
+            addon.functions.preset_registry.sync_default_presets(force=True)
+        start_time = time.time()
+        for scn in bpy.data.scenes:
+            for ag_idx, ag in enumerate(scn.aglist):
+                if args.animations and ag.name not in args.animations:
+                    continue
+                result["animations"].append(rebuild_animation(scn, ag_idx, args.preset))
+        result["build_time"] = time.time() - start_time
+        missing = set(args.animations or []) - set(info["name"] for info in result["animations"])
+        if missing:
+            result["error"] = "Animations not found: " + ", ".join(sorted(missing))
+        if args.save:
+            start_time = time.time()
+            bpy.ops.wm.save_mainfile()
+            result["save_time"] = time.time() - start_time
+        all_built = all(info["status"] == "OK" for info in result["animations"])
+        result["status"] = "OK" if all_built and not missing else "FAILED"
+    except Exception:
+        result["error"] = traceback.format_exc()
+    with open(args.result, "w") as f:
+        json.dump(result, f, indent=2)
+    return 0 if result["status"] == "OK" else 1
+
+
+# main functionality
+def main():
+    args = parse_args(get_script_args())
+    if args.worker:
+        exit_code = build_animations(args)
+    else:
+        exit_code = run_jobs(args)
+    sys.exit(exit_code)
+
+
+main()
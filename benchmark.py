@@ -0,0 +1,319 @@
+#!/usr/bin/env python
+# Author: Christopher Gearhart
+
+# System imports
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+from os.path import basename, dirname, realpath
+
+# TO RUN: blender -b -P benchmark.py -- --sizes 1000 10000 --out results.json
+#         blender -b -P benchmark.py -- --out new.json --baseline results.json
+#     OR: python benchmark.py --compare results.json new.json
+# NOTE: synthetic scenes are built in the open (empty) scene; no GPU/window is needed
+
+
+PHASES = ("create", "update", "retime", "refresh", "visualizer", "start_over")
+
+
+# helper functions
+def get_script_args():
+    """ returns arguments passed to this script (after '--' when run by Blender) """
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1:]
+    return [] if running_in_blender() else sys.argv[1:]
+
+
+def running_in_blender():
+    try:
+        import bpy
+    except ImportError:
+        return False
+    return True
+
+
+def get_addon_directory():
+    return dirname(realpath(__file__))
+
+
+def parse_args(argv:list):
+    parser = argparse.ArgumentParser(description="Benchmark AssemblMe on synthetic scenes")
+    parser.add_argument(
+        "--sizes",
+        help="Object counts to benchmark",
+        dest="sizes",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 100000, 500000],
+    )
+    parser.add_argument(
+        "--layouts",
+        help="Object layouts to benchmark",
+        dest="layouts",
+        nargs="+",
+        choices=["grid", "cloud", "tower"],
+        default=["grid", "cloud", "tower"],
+    )
+    parser.add_argument(
+        "--repeat",
+        help="Times to run each case (the fastest run is reported)",
+        dest="repeat",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--seed",
+        help="Random seed for the 'cloud' layout",
+        dest="seed",
+        type=int,
+        default=0,
+    )
+    parser.add_argument(
+        "--no-fast-keying",
+        help="Benchmark with 'Fast Keying' disabled (the default for new animations)",
+        dest="fast_keying",
+        action="store_false",
+    )
+    parser.add_argument(
+        "--addon",
+        help="Module name AssemblMe is installed as",
+        dest="addon",
+        default=basename(get_addon_directory()),
+    )
+    parser.add_argument(
+        "--out",
+        help="Write JSON results to this file",
+        dest="out",
+    )
+    parser.add_argument(
+        "--baseline",
+        help="Compare results against this JSON results file",
+        dest="baseline",
+    )
+    parser.add_argument(
+        "--compare",
+        help="Compare two existing results files (BASELINE CURRENT) without running",
+        dest="compare",
+        nargs=2,
+    )
+    parser.add_argument(
+        "--tolerance",
+        help="Relative slowdown reported as a regression",
+        dest="tolerance",
+        type=float,
+        default=0.15,
+    )
+    parser.add_argument(
+        "--min-delta",
+        help="Slowdowns smaller than this many seconds are ignored",
+        dest="min_delta",
+        type=float,
+        default=0.05,
+    )
+    return parser.parse_args(argv)
+
+
+# scene generation
+def get_layout_locations(layout:str, size:int, seed:int=0):
+    """ returns (size, 3) array of object locations for the given layout """
+    import numpy as np
+    if layout == "grid":
+        # cube of objects one unit apart
+        side = int(np.ceil(size ** (1 / 3)))
+        idxs = np.arange(size)
+        return np.column_stack((idxs % side, idxs // side % side, idxs // side ** 2)).astype(np.float32)
+    elif layout == "cloud":
+        # uniformly random in a box with the same density as the grid
+        side = size ** (1 / 3)
+        return np.random.default_rng(seed).uniform(0, side, (size, 3)).astype(np.float32)
+    elif layout == "tower":
+        # 4x4 footprint, so nearly every layer holds 16 objects
+        idxs = np.arange(size)
+        return np.column_stack((idxs % 4, idxs // 4 % 4, idxs // 16)).astype(np.float32)
+    raise ValueError("Unknown layout: " + layout)
+
+
+def create_scene(layout:str, size:int, seed:int=0):
+    """ creates collection of 'size' cubes in the given layout and returns it """
+    import bpy
+    import bmesh
+    scn = bpy.context.scene
+    # all objects share one small mesh
+    mesh = bpy.data.meshes.new("benchmark_cube")
+    bm = bmesh.new()
+    bmesh.ops.create_cube(bm, size=0.5)
+    bm.to_mesh(mesh)
+    bm.free()
+    coll = bpy.data.collections.new("benchmark_%(layout)s_%(size)s" % locals())
+    scn.collection.children.link(coll)
+    for i in range(size):
+        coll.objects.link(bpy.data.objects.new("benchmark_%(i)07d" % locals(), mesh))
+    coll.objects.foreach_set("location", get_layout_locations(layout, size, seed).ravel())
+    bpy.context.view_layer.update()
+    return coll
+
+
+def create_animation(coll, fast_keying:bool=True):
+    """ adds AssemblMe animation for coll and makes it active """
+    import bpy
+    scn = bpy.context.scene
+    ag = scn.aglist.add()
+    scn.aglist_index = len(scn.aglist) - 1
+    ag.name = coll.name
+    ag.id = max([ag0.id for ag0 in scn.aglist]) + 1
+    ag.idx = scn.aglist_index
+    ag.collection = coll
+    ag.use_fast_keying = fast_keying
+    return ag
+
+
+def remove_scene(coll):
+    """ removes benchmark collection, its objects, animations and orphaned data """
+    import bpy
+    scn = bpy.context.scene
+    for i in reversed(range(len(scn.aglist))):
+        if scn.aglist[i].collection == coll:
+            scn.aglist.remove(i)
+    scn.aglist_index = len(scn.aglist) - 1
+    bpy.data.batch_remove(list(coll.objects) + [coll])
+    bpy.data.orphans_purge(do_recursive=True)
+
+
+# benchmark cases
+def run_operator(op, timings:dict, phase:str):
+    start_time = time.perf_counter()
+    result = op()
+    timings[phase] = time.perf_counter() - start_time
+    if "FINISHED" not in result:
+        raise RuntimeError("'%(phase)s' returned %(result)s" % locals())
+
+
+def build_visualizer(addon):
+    """ builds the visualizer lattice and animation without its modal operator (needs no window) """
+    import bpy
+    visualizer_updates = addon.functions.visualizer_updates
+    scn = bpy.context.scene
+    mesh = bpy.data.meshes.new("benchmark_visualizer_m")
+    v_obj = bpy.data.objects.new("benchmark_visualizer", mesh)
+    try:
+        visualizer_updates.set_visualizer_lattice(v_obj, scn)
+        visualizer_updates.set_visualizer_orientation(v_obj, scn.aglist[scn.aglist_index])
+        visualizer_updates.set_visualizer_animation(v_obj, scn.aglist[scn.aglist_index])
+    finally:
+        bpy.data.batch_remove([v_obj, mesh])
+
+
+def run_case(addon, layout:str, size:int, seed:int, fast_keying:bool=True):
+    """ times each AssemblMe phase on a fresh synthetic scene """
+    import bpy
+    timings = dict()
+    start_time = time.perf_counter()
+    coll = create_scene(layout, size, seed)
+    timings["setup"] = time.perf_counter() - start_time
+    try:
+        ag = create_animation(coll, fast_keying)
+        run_operator(bpy.ops.assemblme.create_build_animation, timings, "create")
+        anim_length = ag.anim_length
+        # rebuild after a change to an existing animation
+        ag.velocity += 1
+        run_operator(bpy.ops.assemblme.create_build_animation, timings, "update")
+        ag.build_speed += 1
+        run_operator(bpy.ops.assemblme.retime_build_animation, timings, "retime")
+        run_operator(bpy.ops.assemblme.refresh_anim_length, timings, "refresh")
+        start_time = time.perf_counter()
+        build_visualizer(addon)
+        timings["visualizer"] = time.perf_counter() - start_time
+        run_operator(bpy.ops.assemblme.start_over, timings, "start_over")
+    finally:
+        remove_scene(coll)
+    return timings, anim_length
+
+
+def run_benchmarks(args):
+    import bpy
+    import addon_utils
+    if not hasattr(bpy.types.Scene, "aglist"):
+        addon_utils.enable(args.addon, default_set=False, handle_error=None)
+    addon = sys.modules[args.addon]
+    results = {
+        "blender_version": bpy.app.version_string,
+        "addon_version": bpy.props.assemblme_version,
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "fast_keying": args.fast_keying,
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "cases": [],
+    }
+    for layout in args.layouts:
+        for size in args.sizes:
+            case = {"layout": layout, "size": size, "timings": dict(), "runs": []}
+            for _ in range(args.repeat):
+                timings, case["anim_length"] = run_case(addon, layout, size, args.seed, args.fast_keying)
+                case["runs"].append(timings)
+            for phase in case["runs"][0]:
+                case["timings"][phase] = min(run[phase] for run in case["runs"])
+            print("%(layout)-6s %(size)8d  " % case + "  ".join("%s %.3fs" % (phase, case["timings"][phase]) for phase in PHASES))
+            results["cases"].append(case)
+    return results
+
+
+# baseline comparison
+def compare_results(baseline:dict, current:dict, tolerance:float, min_delta:float):
+    """ prints timings relative to baseline and returns list of regressions """
+    baseline_cases = {(case["layout"], case["size"]): case for case in baseline["cases"]}
+    regressions = []
+    print("%-6s %8s  %-10s %10s %10s %8s" % ("layout", "size", "phase", "baseline", "current", "ratio"))
+    for case in current["cases"]:
+        baseline_case = baseline_cases.get((case["layout"], case["size"]))
+        if baseline_case is None:
+            continue
+        for phase in PHASES:
+            if phase not in case["timings"] or phase not in baseline_case["timings"]:
+                continue
+            old_time = baseline_case["timings"][phase]
+            new_time = case["timings"][phase]
+            ratio = new_time / old_time if old_time > 0 else float("inf")
+            regressed = ratio > 1 + tolerance and new_time - old_time > min_delta
+            print("%-6s %8d  %-10s %9.3fs %9.3fs %7.2fx%s" % (case["layout"], case["size"], phase, old_time, new_time, ratio, "  REGRESSION" if regressed else ""))
+            if regressed:
+                regressions.append({"layout": case["layout"], "size": case["size"], "phase": phase, "baseline": old_time, "current": new_time, "ratio": ratio})
+    return regressions
+
+
+def load_results(filepath:str):
+    with open(filepath, "r") as f:
+        return json.load(f)
+
+
+# main functionality
+def main():
+    args = parse_args(get_script_args())
+    if args.compare:
+        baseline, current = (load_results(filepath) for filepath in args.compare)
+    elif not running_in_blender():
+        print("Run with 'blender -b -P benchmark.py -- ...' (or pass '--compare BASELINE CURRENT')")
+        sys.exit(1)
+    else:
+        current = run_benchmarks(args)
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(current, f, indent=2)
+        baseline = load_results(args.baseline) if args.baseline else None
+    exit_code = 0
+    if baseline is not None:
+        regressions = compare_results(baseline, current, args.tolerance, args.min_delta)
+        current["regressions"] = regressions
+        if args.out and not args.compare:
+            with open(args.out, "w") as f:
+                json.dump(current, f, indent=2)
+        if regressions:
+            print("%d regression(s) beyond %d%%" % (len(regressions), args.tolerance * 100))
+            exit_code = 1
+    sys.exit(exit_code)
+
+
+main()
@@ -16,8 +16,18 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from .common import *
+from .animation_index import *
 from .app_handlers import *
+from .build_drivers import *
+from .build_snapshot import *
+from .bulk_keyframes import *
+from .instance_build import *
 from .lattice_mesh_generate import *
+from .layer_planner import *
+from .loose_parts import *
+from .offset_noise import *
+from .preset_registry import *
+from .profiling import *
 from .general import *
 from .property_callbacks import *
-from .timers import *
+from .visualizer_updates import *
@@ -0,0 +1,96 @@
+# Copyright (C) 2025 Christopher Gearhart
+# chris@bricksbroughttolife.com
+# http://bricksbroughttolife.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# System imports
+# NONE!
+
+# Blender imports
+import bpy
+from bpy.types import Scene, Collection, Object
+
+# Module imports
+from .general import get_anim_objects
+
+# aglist indices of each scene's animations by collection: {scene name: {collection pointer: [aglist index, ...]}}
+collection_index_cache = dict()
+# aglist indices of the built animations moving each object: {scene name: {object pointer: [aglist index, ...]}}
+ownership_index_cache = dict()
+
+
+def get_collection_index(scn:Scene):
+    """ returns (cached) map from collection pointer to indices of the animations in scn.aglist using it """
+    index = collection_index_cache.get(scn.name)
+    if index is None:
+        index = dict()
+        for i, ag in enumerate(scn.aglist):
+            if ag.collection is not None:
+                index.setdefault(ag.collection.as_pointer(), []).append(i)
+        collection_index_cache[scn.name] = index
+    return index
+
+
+def get_animation_idxs_for_collection(scn:Scene, coll:Collection):
+    """ returns indices of the animations in scn.aglist that use coll """
+    ag_idxs = get_collection_index(scn).get(coll.as_pointer(), [])
+    # rebuild the index if the aglist changed without invalidating it
+    if any(i >= len(scn.aglist) or scn.aglist[i].collection != coll for i in ag_idxs):
+        clear_animation_indices(scn)
+        ag_idxs = get_collection_index(scn).get(coll.as_pointer(), [])
+    return ag_idxs
+
+
+def get_ownership_index(scn:Scene):
+    """ returns (cached) map from object pointer to indices of the built animations in scn.aglist moving it """
+    index = ownership_index_cache.get(scn.name)
+    if index is None:
+        index = dict()
+        for i, ag in enumerate(scn.aglist):
+            if not ag.animated or ag.collection is None:
+                continue
+            for obj in get_anim_objects(ag):
+                index.setdefault(obj.as_pointer(), []).append(i)
+        ownership_index_cache[scn.name] = index
+    return index
+
+
+def get_conflicting_objects(scn:Scene, ag_idx:int, objects:list[Object]):
+    """ returns objects that are animated by a built animation for a different collection than scn.aglist[ag_idx] """
+    coll = scn.aglist[ag_idx].collection
+    index = get_ownership_index(scn)
+    conflicting_idxs = set()
+    conflicts = []
+    for obj in objects:
+        owner_idxs = index.get(obj.as_pointer())
+        if owner_idxs is None:
+            continue
+        if any(i != ag_idx and scn.aglist[i].collection != coll for i in owner_idxs):
+            conflicts.append(obj)
+            conflicting_idxs.update(owner_idxs)
+    # rebuild the index if the animations it found changed without invalidating it
+    if any(i >= len(scn.aglist) or not scn.aglist[i].animated for i in conflicting_idxs):
+        clear_animation_indices(scn)
+        return get_conflicting_objects(scn, ag_idx, objects)
+    return conflicts
+
+
+def clear_animation_indices(scn:Scene=None):
+    """ invalidate indices of scn (or of all scenes) after animations, collections or their objects change """
+    if scn is None:
+        collection_index_cache.clear()
+        ownership_index_cache.clear()
+    else:
+        collection_index_cache.pop(scn.name, None)
+        ownership_index_cache.pop(scn.name, None)
@@ -26,9 +26,13 @@ from bpy.app.handlers import persistent
 from mathutils import Vector, Euler
 
 # Module imports
+from .animation_index import *
 from .general import *
 from .common import *
 
+# owner of AssemblMe's message bus subscriptions
+msgbus_owner = object()
+
 
 @persistent
 def convert_velocity_value(dummy):
@@ -84,3 +88,49 @@ def handle_upconversion(dummy):
                     snake_prop = camel_to_snake_case(prop)
                     if hasattr(ag, snake_prop):
                         setattr(ag, snake_prop, getattr(ag, prop))
+
+
+def handle_active_object_change(*args):
+    """ make the animation for the new active object's collection active """
+    scn = bpy.context.scene
+    obj = bpy.context.view_layer.objects.active
+    if obj is None or scn.assemblme.last_active_object_name == obj.name:
+        return
+    if scn.aglist_index != -1 and scn.aglist[scn.aglist_index].collection is None:
+        return
+    scn.assemblme.last_active_object_name = obj.name
+    ag_idxs = [i for coll in obj.users_collection for i in get_animation_idxs_for_collection(scn, coll)]
+    # do nothing if the active aglist index refers to one of this object's collections
+    if scn.aglist_index in ag_idxs:
+        return
+    # switch to the first animation for one of this object's collections
+    if len(ag_idxs) > 0:
+        scn.aglist_index = min(ag_idxs)
+        tag_redraw_areas("VIEW_3D")
+    else:
+        scn.aglist_index = -1
+
+
+@persistent
+def subscribe_to_active_object(dummy=None):
+    """ (re)subscribe to active object changes (subscriptions are dropped when a file is loaded) """
+    bpy.msgbus.clear_by_owner(msgbus_owner)
+    bpy.msgbus.subscribe_rna(
+        key=(bpy.types.LayerObjects, "active"),
+        owner=msgbus_owner,
+        args=(),
+        notify=handle_active_object_change,
+        options={"PERSISTENT"},
+    )
+
+
+def unsubscribe_from_active_object():
+    bpy.msgbus.clear_by_owner(msgbus_owner)
+
+
+@persistent
+def handle_collection_changes(scn, depsgraph=None):
+    """ invalidate animation indices when collections (or the objects in them) are added, removed or changed """
+    # undo/redo/load handlers aren't passed a depsgraph (anything may have changed)
+    if not isinstance(depsgraph, bpy.types.Depsgraph) or depsgraph.id_type_updated("COLLECTION"):
+        clear_animation_indices()
@@ -0,0 +1,158 @@
+# Copyright (C) 2025 Christopher Gearhart
+# chris@bricksbroughttolife.com
+# http://bricksbroughttolife.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# System imports
+# NONE!
+
+# Blender imports
+import bpy
+from bpy.types import Object
+
+# Module imports
+# NONE!
+
+# custom property with each object's build timing: [location start frame, rotation start frame, duration]
+BUILD_PROP = "assemblme_build"
+# custom properties with each object's transform before the build and its offset: [base x, y, z, offset x, y, z]
+# (location/rotation are only driven for the random offsets of shared actions, see 'iter_animate_objects_shared')
+OFFSET_PROPS = {
+    "delta_location": "assemblme_loc",
+    "delta_rotation_euler": "assemblme_rot",
+    "location": "assemblme_random_loc",
+    "rotation_euler": "assemblme_random_rot",
+}
+START_IDXS = {"delta_location": 0, "delta_rotation_euler": 1, "location": 0, "rotation_euler": 1}
+
+# progress (0-1) through an object's move, from the scene frame and its start frame 's' and duration 'd'
+PROGRESS_EXPRESSION = "min(max((frame - s) / d, 0), 1)"
+# progress eased to match keyframe interpolation modes (with automatic easing: in for transitional, out for dynamic modes)
+EASE_EXPRESSIONS = {
+    "CONSTANT": "floor({u})",
+    "LINEAR": "{u}",
+    "BEZIER": "{u} * {u} * (3 - 2 * {u})",
+    "SINE": "1 - cos({u} * pi / 2)",
+    "QUAD": "pow({u}, 2)",
+    "CUBIC": "pow({u}, 3)",
+    "QUART": "pow({u}, 4)",
+    "QUINT": "pow({u}, 5)",
+    "EXPO": "(0 if {u} == 0 else pow(2, 10 * ({u} - 1)))",
+    "CIRC": "1 - sqrt(1 - {u} * {u})",
+    "BACK": "1 + 2.70158 * pow({u} - 1, 3) + 1.70158 * pow({u} - 1, 2)",
+    "BOUNCE": "(7.5625 * {u} * {u} if {u} < 1 / 2.75 else 7.5625 * pow({u} - 1.5 / 2.75, 2) + 0.75 if {u} < 2 / 2.75 else 7.5625 * pow({u} - 2.25 / 2.75, 2) + 0.9375 if {u} < 2.5 / 2.75 else 7.5625 * pow({u} - 2.625 / 2.75, 2) + 0.984375)",
+    "ELASTIC": "(1 + pow(2, -10 * {u}) * sin(({u} - 0.075) * 2 * pi / 0.3))",
+}
+
+
+def get_build_expression(interpolation_mode:str, build_type:str):
+    """ returns driver expression for a transform channel (the same for every object)
+
+    Variables: 's' start frame and 'd' duration of the object's move, 'b'
+    value before the build and 'o' offset. Objects rest at b + o
+    before (dis)assembling into place at b (or the reverse).
+
+    """
+    ease = EASE_EXPRESSIONS[interpolation_mode].format(u="(%s)" % PROGRESS_EXPRESSION)
+    if build_type == "ASSEMBLE":
+        return "b + o * (1 - %(ease)s)" % locals()
+    return "b + o * %(ease)s" % locals()
+
+
+def add_build_driver(obj:Object, data_path:str, index:int, expression:str):
+    """ drive obj[data_path][index] with 'expression', reading the variables from obj's build properties """
+    driver = obj.driver_add(data_path, index).driver
+    driver.type = "SCRIPTED"
+    for var in reversed(list(driver.variables)):
+        driver.variables.remove(var)
+    offset_prop = OFFSET_PROPS[data_path]
+    variables = (
+        ("s", '["%s"][%d]' % (BUILD_PROP, START_IDXS[data_path])),
+        ("d", '["%s"][2]' % BUILD_PROP),
+        ("b", '["%s"][%d]' % (offset_prop, index)),
+        ("o", '["%s"][%d]' % (offset_prop, index + 3)),
+    )
+    for name, prop_path in variables:
+        var = driver.variables.new()
+        var.name = name
+        var.type = "SINGLE_PROP"
+        var.targets[0].id_type = "OBJECT"
+        var.targets[0].id = obj
+        var.targets[0].data_path = prop_path
+    driver.expression = expression
+
+
+def add_build_drivers(obj:Object, timing:list, offsets:dict, expressions:dict):
+    """ store build timing and offsets on obj and drive its transforms from them
+
+    Keyword arguments:
+    obj         -- object to animate
+    timing      -- [location start frame, rotation start frame, duration]
+    offsets     -- (base, offset) delta vectors for each animated data path
+    expressions -- driver expression for each animated data path (see 'get_build_expression')
+
+    """
+    obj[BUILD_PROP] = [float(val) for val in timing]
+    for data_path, (base, offset) in offsets.items():
+        obj[OFFSET_PROPS[data_path]] = [float(val) for val in base] + [float(val) for val in offset]
+        for axis in range(3):
+            add_build_driver(obj, data_path, axis, expressions[data_path])
+
+
+def set_build_timing(objects:list[Object], timing):
+    """ update build timing of driven objects (retimes their animation without touching the drivers) """
+    for obj, obj_timing in zip(objects, timing):
+        if obj is None or BUILD_PROP not in obj:
+            continue
+        obj[BUILD_PROP] = [float(val) for val in obj_timing]
+        # drivers don't notice custom property changes on their own
+        obj.update_tag()
+
+
+def get_build_driver_state(obj:Object):
+    """ returns build properties and driver expressions of obj (None if it isn't driven by a build) """
+    if BUILD_PROP not in obj:
+        return None
+    props = {prop: list(obj[prop]) for prop in [BUILD_PROP] + list(OFFSET_PROPS.values()) if prop in obj}
+    expressions = dict()
+    for data_path in OFFSET_PROPS:
+        fcurve = None if obj.animation_data is None else obj.animation_data.drivers.find(data_path, index=0)
+        if fcurve is not None:
+            expressions[data_path] = fcurve.driver.expression
+    return props, expressions
+
+
+def set_build_driver_state(obj:Object, state):
+    """ restore state returned by 'get_build_driver_state' """
+    remove_build_drivers(obj)
+    if state is None:
+        return
+    props, expressions = state
+    offsets = {data_path: (props[prop][:3], props[prop][3:]) for data_path, prop in OFFSET_PROPS.items() if data_path in expressions}
+    add_build_drivers(obj, props[BUILD_PROP], offsets, expressions)
+
+
+def remove_build_drivers(obj:Object):
+    """ remove build drivers and properties from obj, restoring its transforms (returns whether obj was driven) """
+    if BUILD_PROP not in obj:
+        return False
+    for data_path, prop in OFFSET_PROPS.items():
+        if prop not in obj:
+            continue
+        obj.driver_remove(data_path)
+        setattr(obj, data_path, list(obj[prop])[:3])
+        del obj[prop]
+    del obj[BUILD_PROP]
+    return True
@@ -0,0 +1,141 @@
+# Copyright (C) 2025 Christopher Gearhart
+# chris@bricksbroughttolife.com
+# http://bricksbroughttolife.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# System imports
+# NONE!
+
+# Blender imports
+import bpy
+from bpy.types import Object
+
+# Module imports
+from .build_drivers import *
+from .bulk_keyframes import *
+from .layer_planner import *
+
+# animation properties set when an animation is built
+BUILD_PROPS = (
+    "animated",
+    "anim_length",
+    "anim_bounds_start",
+    "anim_bounds_end",
+    "frame_with_orig_loc",
+    "time_created",
+    "last_layer_velocity",
+    "plan_stamp",
+    "obj_min_loc",
+    "obj_max_loc",
+)
+
+
+class BuildSnapshot:
+    """ state of animations and their objects before a build, so a cancelled build can be undone
+
+    Objects are only captured (see 'capture') right before the build first
+    changes them, so builds touching few objects copy few actions.
+
+    """
+
+    def __init__(self, scn, ags:list):
+        self.scene_name = scn.name
+        self.ag_props = {ag.id: {prop: get_prop_value(ag, prop) for prop in BUILD_PROPS} for ag in ags}
+        self.plans = {ag.id: (get_cached_plan(ag), get_built_plan(ag)) for ag in ags}
+        self.object_names = []
+        self.locations = []
+        self.rotations = []
+        self.driver_states = []
+        self.action_names = []
+        self.action_copies = dict()
+
+    def capture(self, objects:list[Object]):
+        """ remember animation and transforms of objects not captured yet (call before changing them) """
+        captured = set(self.object_names)
+        objects = [obj for obj in objects if obj.name not in captured]
+        if len(objects) == 0:
+            return
+        self.object_names += [obj.name for obj in objects]
+        self.locations += list(get_object_vectors(objects, "location"))
+        self.rotations += list(get_object_vectors(objects, "rotation_euler"))
+        self.driver_states += [get_build_driver_state(obj) for obj in objects]
+        # copy each action once (actions may be shared between objects)
+        for obj in objects:
+            action = get_action(obj)
+            self.action_names.append(None if action is None else action.name)
+            if action is not None and action.name not in self.action_copies:
+                self.action_copies[action.name] = action.copy()
+
+    def restore(self):
+        """ put animations, actions and transforms back the way they were when the snapshot was taken """
+        # remap every user of the (modified) actions to the unmodified copies
+        actions = {name: bpy.data.actions.get(name) for name in self.action_copies}
+        for name, action_copy in self.action_copies.items():
+            if actions[name] is not None:
+                actions[name].user_remap(action_copy)
+        # reassign actions cleared by the build and unassign actions it created
+        for obj_name, action_name in zip(self.object_names, self.action_names):
+            obj = bpy.data.objects.get(obj_name)
+            if obj is None:
+                continue
+            action_copy = self.action_copies.get(action_name)
+            cur_action = get_action(obj)
+            if cur_action is action_copy:
+                continue
+            if action_copy is None:
+                obj.animation_data.action = None
+            else:
+                (obj.animation_data or obj.animation_data_create()).action = action_copy
+            if cur_action is not None and cur_action.users == 0 and cur_action.name not in actions:
+                bpy.data.actions.remove(cur_action)
+        for name, action_copy in self.action_copies.items():
+            if actions[name] is not None:
+                bpy.data.actions.remove(actions[name])
+            action_copy.name = name
+        self.action_copies.clear()
+        # restore build drivers (see 'use_drivers') and transforms of objects that weren't animated
+        for obj_name, loc, rot, driver_state in zip(self.object_names, self.locations, self.rotations, self.driver_states):
+            obj = bpy.data.objects.get(obj_name)
+            if obj is not None:
+                set_build_driver_state(obj, driver_state)
+                obj.location = loc
+                obj.rotation_euler = rot
+        # restore animation properties and cached plans
+        scn = bpy.data.scenes.get(self.scene_name)
+        for ag in scn.aglist if scn is not None else []:
+            if ag.id not in self.ag_props:
+                continue
+            for prop, value in self.ag_props[ag.id].items():
+                setattr(ag, prop, value)
+            plan, built_plan = self.plans[ag.id]
+            if plan is None:
+                clear_cached_plan(ag)
+            else:
+                cache_plan(ag, plan)
+            if built_plan is None:
+                clear_built_plan(ag)
+            else:
+                cache_built_plan(ag, built_plan)
+
+    def free(self):
+        """ remove the action copies (call once the build is kept) """
+        for action_copy in self.action_copies.values():
+            bpy.data.actions.remove(action_copy)
+        self.action_copies.clear()
+
+
+def get_prop_value(ag, prop:str):
+    value = getattr(ag, prop)
+    return tuple(value) if hasattr(value, "__len__") else value
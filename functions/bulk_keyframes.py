@@ -0,0 +1,231 @@
+# Copyright (C) 2025 Christopher Gearhart
+# chris@bricksbroughttolife.com
+# http://bricksbroughttolife.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# System imports
+from itertools import chain
+import numpy as np
+
+# Blender imports
+import bpy
+from bpy.types import Object, FCurve, Keyframe
+
+# Module imports
+from .common import *
+
+# custom property marking actions created by AssemblMe (removed again by 'remove_empty_action')
+ACTION_TAG = "assemblme_action"
+
+
+def get_interpolation_value(mode:str):
+    """ returns integer value of keyframe interpolation enum item (for use with foreach_set) """
+    return Keyframe.bl_rna.properties["interpolation"].enum_items[mode].value
+
+
+def get_default_interpolation_value():
+    """ returns integer value of the interpolation mode Blender assigns to new keyframes """
+    return get_interpolation_value(bpy.context.preferences.edit.keyframe_new_interpolation_type)
+
+
+def get_object_vectors(objects:list[Object], attr:str):
+    """ returns (n, 3) array of a vector property (e.g. 'location') read from each object """
+    n = len(objects)
+    values = chain.from_iterable(getattr(obj, attr) for obj in objects)
+    return np.fromiter(values, dtype=np.float64, count=n * 3).reshape(n, 3)
+
+
+def get_action(obj:Object):
+    anim_data = obj.animation_data
+    return None if anim_data is None else anim_data.action
+
+
+def tag_new_actions(objects:list[Object], old_actions:list):
+    """ mark actions that were created while keying objects (old_actions are the actions before keying) """
+    for obj, old_action in zip(objects, old_actions):
+        action = get_action(obj)
+        if action is not None and old_action is None:
+            action[ACTION_TAG] = True
+
+
+def remove_empty_action(obj:Object):
+    """ unassign (and remove, if unused) action created by AssemblMe once obj has no fcurves left in it """
+    action = get_action(obj)
+    if action is None or not action.get(ACTION_TAG) or len(get_fcurves(obj)) > 0:
+        return
+    obj.animation_data.action = None
+    if action.users == 0:
+        bpy.data.actions.remove(action)
+
+
+def assign_action(obj:Object, action):
+    """ animate obj with action (using the action's first slot on layered actions) """
+    anim_data = obj.animation_data or obj.animation_data_create()
+    anim_data.action = action
+    if bpy.app.version[:2] >= (4, 4) and anim_data.action_slot is None and len(action.slots) > 0:
+        anim_data.action_slot = action.slots[0]
+
+
+def get_fcurves(obj:Object):
+    """ returns fcurves of the object's action (for the object's slot on layered actions) """
+    anim_data = obj.animation_data
+    if anim_data is None or anim_data.action is None:
+        return []
+    if bpy.app.version[:2] < (4, 4):
+        return anim_data.action.fcurves
+    from bpy_extras.anim_utils import action_get_channelbag_for_slot
+    channelbag = action_get_channelbag_for_slot(anim_data.action, anim_data.action_slot)
+    return [] if channelbag is None else channelbag.fcurves
+
+
+def ensure_fcurve(obj:Object, data_path:str, index:int, group_name:str="Object Transforms"):
+    """ returns fcurve animating obj[data_path][index], creating the action and fcurve if necessary """
+    anim_data = obj.animation_data or obj.animation_data_create()
+    if anim_data.action is None:
+        anim_data.action = bpy.data.actions.new(obj.name + "Action")
+        anim_data.action[ACTION_TAG] = True
+    action = anim_data.action
+    if bpy.app.version[:2] < (4, 4):
+        fcurve = action.fcurves.find(data_path, index=index)
+        return fcurve or action.fcurves.new(data_path, index=index, action_group=group_name)
+    return action.fcurve_ensure_for_datablock(obj, data_path, index=index, group_name=group_name)
+
+
+def add_keyframes(fcurve:FCurve, frames:np.ndarray, values:np.ndarray, interpolations:np.ndarray):
+    """ append keyframes to fcurve in bulk (existing keyframes are kept)
+
+    Keyword arguments:
+    fcurve         -- fcurve to add keyframes to
+    frames         -- frame of each new keyframe
+    values         -- value of each new keyframe
+    interpolations -- interpolation enum value of each new keyframe (see get_interpolation_value)
+
+    """
+    keyframe_points = fcurve.keyframe_points
+    num_old = len(keyframe_points)
+    num_new = len(frames)
+    # read existing keyframes, as foreach_set always writes the whole collection
+    co = np.empty((num_old + num_new) * 2, dtype=np.float32)
+    interpolation = np.empty(num_old + num_new, dtype=np.int32)
+    if num_old > 0:
+        keyframe_points.foreach_get("co", co[:num_old * 2])
+        keyframe_points.foreach_get("interpolation", interpolation[:num_old])
+    co[num_old * 2::2] = frames
+    co[num_old * 2 + 1::2] = values
+    interpolation[num_old:] = interpolations
+    # add and write all keyframes at once
+    keyframe_points.add(num_new)
+    keyframe_points.foreach_set("co", co)
+    keyframe_points.foreach_set("interpolation", interpolation)
+    # sort keyframes and recalculate handles
+    fcurve.update()
+
+
+def set_keyframes(fcurve:FCurve, frames:np.ndarray, values:np.ndarray, interpolations:np.ndarray):
+    """ replace all keyframes on fcurve in bulk (reusing existing keyframe points where possible) """
+    keyframe_points = fcurve.keyframe_points
+    num_extra = len(frames) - len(keyframe_points)
+    if num_extra > 0:
+        keyframe_points.add(num_extra)
+    for _ in range(-num_extra):
+        keyframe_points.remove(keyframe_points[-1], fast=True)
+    co = np.empty(len(frames) * 2, dtype=np.float32)
+    co[0::2] = frames
+    co[1::2] = values
+    keyframe_points.foreach_set("co", co)
+    keyframe_points.foreach_set("interpolation", np.asarray(interpolations, dtype=np.int32))
+    fcurve.update()
+
+
+def replace_keyframes(fcurve:FCurve, old_frames:np.ndarray, old_values:np.ndarray, frames:np.ndarray, values:np.ndarray, interpolations:np.ndarray):
+    """ replace keyframes at 'old_frames' with 'old_values' by new keyframes (other keyframes on fcurve are kept)
+
+    Fcurves holding only the old keyframes (i.e. ones AssemblMe created) are
+    overwritten in place with 'set_keyframes'.
+
+    """
+    keyframe_points = fcurve.keyframe_points
+    co = np.empty(len(keyframe_points) * 2, dtype=np.float32)
+    keyframe_points.foreach_get("co", co)
+    matched = match_keyframes(co[::2], old_frames, co[1::2], old_values)[0]
+    if matched.all():
+        set_keyframes(fcurve, frames, values, interpolations)
+        return
+    # remove from the end so earlier indices stay valid
+    for i in np.flatnonzero(matched)[::-1]:
+        keyframe_points.remove(keyframe_points[int(i)], fast=True)
+    add_keyframes(fcurve, frames, values, interpolations)
+
+
+def match_keyframes(frames:np.ndarray, old_frames:np.ndarray, values:np.ndarray=None, old_values:np.ndarray=None):
+    """ returns (matched, idxs): which keyframes are at one of 'old_frames' (with the same value in 'old_values', if passed), and the index of that old keyframe """
+    # compare at the precision keyframes are stored with
+    matches = np.abs(frames[:, None] - old_frames.astype(np.float32)[None, :]) <= 1e-3
+    if values is not None and old_values is not None:
+        matches &= np.isclose(values[:, None], old_values.astype(np.float32)[None, :], rtol=1e-5, atol=1e-5)
+    return matches.any(axis=1), matches.argmax(axis=1)
+
+
+def retime_keyframes(fcurve:FCurve, old_frames:np.ndarray, new_frames:np.ndarray, old_values:np.ndarray=None):
+    """ move keyframes at 'old_frames' (with 'old_values', if passed) to 'new_frames' (other keyframes on fcurve are left alone) """
+    keyframe_points = fcurve.keyframe_points
+    num_keyframes = len(keyframe_points)
+    if num_keyframes == 0:
+        return
+    co = np.empty(num_keyframes * 2, dtype=np.float32)
+    keyframe_points.foreach_get("co", co)
+    frames = co[::2]
+    matched, idxs = match_keyframes(frames, old_frames, co[1::2], old_values)
+    if not matched.any():
+        return
+    frames[matched] = new_frames[idxs[matched]]
+    keyframe_points.foreach_set("co", co)
+    fcurve.update()
+
+
+def remove_keyframes(fcurve:FCurve, frames:np.ndarray, values:np.ndarray=None):
+    """ remove keyframes at 'frames' (with 'values', if passed) from fcurve (other keyframes are left alone), returning number removed """
+    keyframe_points = fcurve.keyframe_points
+    num_keyframes = len(keyframe_points)
+    if num_keyframes == 0:
+        return 0
+    co = np.empty(num_keyframes * 2, dtype=np.float32)
+    keyframe_points.foreach_get("co", co)
+    matched = match_keyframes(co[::2], frames, co[1::2], values)[0]
+    remove_idxs = np.flatnonzero(matched)
+    # remove from the end so earlier indices stay valid
+    for i in remove_idxs[::-1]:
+        keyframe_points.remove(keyframe_points[int(i)], fast=True)
+    if len(remove_idxs) > 0:
+        fcurve.update()
+    return len(remove_idxs)
+
+
+def set_keyframe_interpolation(fcurve:FCurve, interpolation:int, start_frame:float, end_frame:float):
+    """ set interpolation of all keyframes in [start_frame, end_frame] with one read and one write """
+    keyframe_points = fcurve.keyframe_points
+    num_keyframes = len(keyframe_points)
+    if num_keyframes == 0:
+        return
+    co = np.empty(num_keyframes * 2, dtype=np.float32)
+    interpolations = np.empty(num_keyframes, dtype=np.int32)
+    keyframe_points.foreach_get("co", co)
+    keyframe_points.foreach_get("interpolation", interpolations)
+    frames = co[::2]
+    in_range = (start_frame <= frames) & (frames <= end_frame)
+    if not in_range.any():
+        return
+    interpolations[in_range] = interpolation
+    keyframe_points.foreach_set("interpolation", interpolations)
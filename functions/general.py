@@ -16,7 +16,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 # System imports
-import random
+import numpy as np
 import sys
 import time
 import os
@@ -34,6 +34,11 @@ from bpy.props import *
 # Module imports
 from .common import *
 from .common.blender import *
+from .build_drivers import *
+from .bulk_keyframes import *
+from .instance_build import *
+from .layer_planner import *
+from .loose_parts import *
 
 
 def get_active_context_info(ag_idx:int=None):
@@ -47,31 +52,45 @@ def assemblme_handle_exception():
     handle_exception(log_name="AssemblMe log", report_button_loc="AssemblMe > Animations > Report Error")
 
 
-def get_randomized_orient(orient:float, random_amount:float):
-    """ returns randomized orientation based on user settings """
-    return orient + random.uniform(-random_amount, random_amount)
+def get_offset_locations(ag, objects:list[Object], locs:np.ndarray, noise:np.ndarray):
+    """ returns randomized location offsets for objects at 'locs' (local locations) in one array
 
+    Keyword arguments:
+    ag      -- animated collection settings
+    objects -- objects the locations belong to
+    locs    -- (n, 3) array of original object locations
+    noise   -- (n, 3) array of uniform random values in [-1, 1] scaled by ag.loc_random
 
-def get_offset_location(ag, loc:Vector):
-    """ returns randomized location offset """
-    loc_random = ag.loc_random
-    loc_offset = ag.loc_offset
-    sum_loc_offset = max(sum(loc_offset), 0.00001)
-    X = loc[0] + random.uniform(-loc_random, loc_random) * (loc_offset.x / sum_loc_offset) + loc_offset.x
-    Y = loc[1] + random.uniform(-loc_random, loc_random) * (loc_offset.y / sum_loc_offset) + loc_offset.y
-    Z = loc[2] + random.uniform(-loc_random, loc_random) * (loc_offset.z / sum_loc_offset) + loc_offset.z
-    return (X, Y, Z)
+    """
+    loc_offset = np.array(ag.loc_offset)
+    sum_loc_offset = max(sum(ag.loc_offset), 0.00001)
+    deltas = noise * ag.loc_random * (loc_offset / sum_loc_offset) + loc_offset
+    if ag.use_global:
+        # offsets are in world space, so map them into the parent space of parented objects
+        for i, obj in enumerate(objects):
+            if obj is None or obj.parent is None:
+                continue
+            parent_mat = (obj.matrix_world @ obj.matrix_basis.inverted_safe()).to_3x3()
+            deltas[i] = parent_mat.inverted_safe() @ Vector(deltas[i])
+    return locs + deltas
+
+
+def get_offset_rotations(ag, rots:np.ndarray, noise:np.ndarray):
+    """ returns randomized rotation offsets for objects with rotations 'rots' in one array """
+    rot_offset = np.array(ag.rot_offset)
+    sum_rot_offset = max(sum(ag.rot_offset), 0.00001)
+    return rots + noise * ag.rot_random * (rot_offset / sum_rot_offset) + rot_offset
 
 
-def get_offset_rotation(ag, rot:Vector):
-    """ returns randomized rotation offset """
-    rot_random = ag.rot_random
-    rot_offset = ag.rot_offset
-    sum_rot_offset = max(sum(rot_offset), 0.00001)
-    x = rot[0] + random.uniform(-rot_random, rot_random) * (rot_offset.x / sum_rot_offset) + rot_offset.x
-    y = rot[1] + random.uniform(-rot_random, rot_random) * (rot_offset.y / sum_rot_offset) + rot_offset.y
-    z = rot[2] + random.uniform(-rot_random, rot_random) * (rot_offset.z / sum_rot_offset) + rot_offset.z
-    return (x, y, z)
+def get_animated_data_paths(ag):
+    """ returns data paths of the channels AssemblMe keys for this animation """
+    data_paths = []
+    prefix = "delta_" if ag.use_shared_actions or ag.use_drivers or ag.use_instances or ag.use_loose_parts else ""
+    if any(ag.loc_offset) or ag.loc_random != 0:
+        data_paths.append(prefix + "location")
+    if any(ag.rot_offset) or ag.rot_random != 0:
+        data_paths.append(prefix + "rotation_euler")
+    return data_paths
 
 
 def get_build_speed(ag):
@@ -85,16 +104,15 @@ def get_object_velocity(ag):
     return frameVelocity
 
 
-def get_anim_length(ag, objects_to_move:list[Object], list_z_values:list[dict[str, int|Object]], layer_height, inverted_build:bool, skip_empty_selections:bool):
-    temp_obj_count = 0
-    num_layers = 0
-    last_lower_bound = None
-    while len(objects_to_move) > temp_obj_count:
-        objs, last_lower_bound = get_new_selection(list_z_values, layer_height, inverted_build, skip_empty_selections, last_lower_bound)
-        num_objs = len(objs)
-        num_layers += 1 if num_objs > 0 or not skip_empty_selections else 0
-        temp_obj_count += num_objs
-    return (num_layers - 1) * get_build_speed(ag) + get_object_velocity(ag) + 1
+def get_anim_length(ag, plan:AnimationPlan):
+    """ calculates and returns number of frames the animation will last (using current ag layer settings) """
+    num_steps = get_num_build_steps(plan.get_layer_keys(ag.inverted_build), ag.layer_height, ag.skip_empty_selections)
+    return get_anim_length_for_steps(ag, num_steps)
+
+
+def get_anim_length_for_steps(ag, num_steps:int):
+    """ calculates and returns number of frames an animation with 'num_steps' build steps will last """
+    return (num_steps - 1) * get_build_speed(ag) + get_object_velocity(ag) + 1
 
 
 def get_preset_filenames(dir:str):
@@ -106,23 +124,6 @@ def get_presets_filepath():
     return os.path.abspath(os.path.join(get_addon_directory(), "..", "..", "presets", "assemblme"))
 
 
-def get_preset_tuples(self, context:Context):
-    # initialize presets path
-    path = get_presets_filepath()
-    # set up presets folder and transfer default presets
-    if not os.path.exists(path):
-        os.makedirs(path)
-    if not bpy.app.background:
-        transfer_defaults_to_preset_folder(path)
-    # get list of filenames in presets directory
-    filenames = get_preset_filenames(path)
-    # refresh preset names
-    filenames.sort()
-    preset_names = [("None", "None", "Don't use a preset")]
-    preset_names += [(filenames[i][:-3], filenames[i][:-3].replace("_", " ").capitalize(), "Select this preset!") for i in range(len(filenames))]
-    return preset_names
-
-
 def transfer_defaults_to_preset_folder(presets_path:str):
     default_presets_path = join(dirname(dirname(abspath(__file__))), "lib", "default_presets")
     filenames = get_preset_filenames(default_presets_path)
@@ -139,65 +140,20 @@ def transfer_defaults_to_preset_folder(presets_path:str):
         copyfile(src, dst)
 
 
-def get_list_z_values(ag, objects:list[Object], rot_x_l:bool=False, rot_y_l:bool=False):
-    """ returns list of dicts containing objects and ther z locations relative to layer orientation """
-    # assemble list of dictionaries into 'list_z_values'
-    list_z_values = []
-    if not rot_x_l:
-        rot_x_l = [get_randomized_orient(ag.orient[0], ag.orient_random) for i in range(len(objects))]
-        rot_y_l = [get_randomized_orient(ag.orient[1], ag.orient_random) for i in range(len(objects))]
-    for i,obj in enumerate(objects):
-        l = obj.matrix_world.to_translation() if ag.use_global else obj.location
-        rot_x = rot_x_l[i]
-        rot_y = rot_y_l[i]
-        z_loc = (l.z * cos(rot_x) * cos(rot_y)) + (l.x * sin(rot_y)) + (l.y * -sin(rot_x))
-        list_z_values.append({"loc":z_loc, "obj":obj})
-
-    # sort list by "loc" key (relative z values)
-    list_z_values.sort(key=lambda x: x["loc"], reverse=not ag.inverted_build)
-
-    # return list of dictionaries
-    return list_z_values, rot_x_l, rot_y_l
-
-
-def get_objs_in_bound(list_z_values:list[dict[str, int|Object]], z_lower_bound:int, inverted_build:bool):
-    """ select objects in bounds from list_z_values """
-    objs_in_bound = []
-    # iterate through objects in list_z_values (breaks when outside range)
-    for i,lst in enumerate(list_z_values):
-        # set obj and z_loc
-        obj = lst["obj"]
-        z_loc = lst["loc"]
-        # check if object is in bounding z value
-        if z_loc >= z_lower_bound and not inverted_build or z_loc <= z_lower_bound and inverted_build:
-            objs_in_bound.append(obj)
-        # if not, break for loop and pop previous objects from list_z_values
-        else:
-            for j in range(i):
-                list_z_values.pop(0)
-            break
-    return objs_in_bound
-
-
-def get_new_selection(list_z_values:list[dict[str, int|Object]], layer_height:int, inverted_build:bool, skip_empty_selections:bool, last_lower_bound:int=None):
-    """ selects next layer of objects """
-    # get new upper and lower bounds
-    z_upper_bound = list_z_values[0]["loc"] if skip_empty_selections or last_lower_bound is None else last_lower_bound
-    z_lower_bound = z_upper_bound + layer_height * (1 if inverted_build else -1)
-    # select objects in bounds
-    objs_in_bound = get_objs_in_bound(list_z_values, z_lower_bound, inverted_build)
-    return objs_in_bound, z_lower_bound
-
-
-def set_bounds_for_visualizer(ag, list_z_values:list[dict[str, int|Object]]):
-    for z_value in list_z_values:
-        obj = z_value["obj"]
+def set_bounds_for_visualizer(ag, plan:AnimationPlan):
+    if plan.num_layers == 0:
+        return
+    if plan.instancer is not None:
+        locs = (get_loose_part_locations(ag) if ag.use_loose_parts else get_instance_locations(ag))[plan.point_idxs]
+        ag.obj_min_loc = locs[plan.layer_slice(0)][0]
+        ag.obj_max_loc = locs[plan.layer_slice(-1)][-1]
+        return
+    for obj in plan.layer_objects(0):
         if ag.mesh_only and obj.type != "MESH":
             continue
         ag.obj_min_loc = obj.location.copy()
         break
-    for z_value in reversed(list_z_values):
-        obj = z_value["obj"]
+    for obj in reversed(plan.layer_objects(-1)):
         if ag.mesh_only and obj.type != "MESH":
             continue
         ag.obj_max_loc = obj.location.copy()
@@ -224,145 +180,559 @@ def layers(l):
 
 def get_default_preset_names():
     default_preset_path = os.path.join(get_addon_directory(), "lib", "default_presets")
-    return [os.path.splitext(fn)[0] for fn in os.listdir(default_preset_path) if fn.endswith(".py")]
+    return [os.path.splitext(fn)[0] for fn in os.listdir(default_preset_path) if fn.endswith(".json")]
 
 
 def clear_animation(objs:list[Object]):
     objs = confirm_iter(objs)
     for obj in objs:
+        remove_build_drivers(obj)
         obj.animation_data_clear()
     depsgraph_update()
 
 
+def remove_built_keyframes(plan:AnimationPlan):
+    """ remove keyframes recorded in plan.keyed_frames (and plan.keyed_values) from its objects, returning number of keyframes removed """
+    num_removed = 0
+    for i, obj in enumerate(plan.objects):
+        if obj is None:
+            continue
+        fcurves = get_fcurves(obj)
+        for fcurve in list(fcurves):
+            frames = plan.keyed_frames.get(fcurve.data_path)
+            if frames is None:
+                continue
+            num_removed += remove_keyframes(fcurve, frames[i], get_keyed_values(plan, fcurve.data_path, i, fcurve.array_index))
+            if len(fcurve.keyframe_points) == 0:
+                fcurves.remove(fcurve)
+        remove_empty_action(obj)
+        if plan.driven:
+            remove_build_drivers(obj)
+    return num_removed
+
+
+def get_keyed_values(plan:AnimationPlan, data_path:str, i:int, axis:int):
+    """ returns values keyed for entry i of plan at its keyed frames (or None for plans built before values were recorded) """
+    if plan.keyed_values is None or data_path not in plan.keyed_values:
+        return None
+    return plan.keyed_values[data_path][i, :, axis]
+
+
+def clear_build_animations(ags:list, objects:list[Object]):
+    """ remove keyframes created by the given animations, returning number of keyframes removed
+
+    Only the keyframes recorded when each animation was built are removed,
+    so other animation on the objects is kept. If an animation's keyframes
+    are unknown (e.g. it was built in an earlier session), all animation
+    data is cleared from 'objects' instead.
+
+    """
+    for ag0 in ags:
+        remove_instance_build(ag0)
+        if ag0.use_loose_parts and ag0.animated and get_parts_object(ag0) is not None:
+            remove_loose_part_build(get_parts_object(ag0))
+    plans = [get_built_plan(ag0) for ag0 in ags if ag0.animated]
+    if any(plan is None for plan in plans):
+        clear_animation(objects)
+        return None
+    num_removed = sum(remove_built_keyframes(plan) for plan in plans)
+    for ag0 in ags:
+        clear_built_plan(ag0)
+    return num_removed
+
+
 def created_with_unsupported_version(ag):
     return ag.version[:3] != bpy.props.assemblme_version[:3]
 
 
 def set_interpolation(objs:list[Object], data_path:str, mode:str, start_frame:int=0, end_frame:int=1048574):
     objs = confirm_iter(objs)
+    interpolation = get_interpolation_value(mode)
     for obj in objs:
-        if obj.animation_data is None:
-            continue
-        if bpy.app.version[:2] < (4, 4):
-            fcurves = obj.animation_data.action.fcurves
-        else:
-            fcurves = obj.animation_data.action.layers[0].strips[0].channelbag(action.slots[0]).fcurves
-        for fcurve in fcurves:
+        for fcurve in get_fcurves(obj):
             if fcurve is None or not fcurve.data_path.startswith(data_path):
                 continue
-            for kf in fcurve.keyframe_points:
-                if start_frame <= kf.co[0] <= end_frame:
-                    kf.interpolation = mode
-
+            set_keyframe_interpolation(fcurve, interpolation, start_frame, end_frame)
 
-def animate_objects(ag, objects_to_move:list[Object], list_z_values:list[dict[str, int|Object]], cur_frame:int, loc_interpolation_mode:str="LINEAR", rot_interpolation_mode:str="LINEAR"):
-    """ animates objects """
 
-    # initialize variables for use in while loop
+def animate_objects(ag, objects_to_move:list[Object], plan:AnimationPlan, cur_frame:int, loc_interpolation_mode:str="LINEAR", rot_interpolation_mode:str="LINEAR", prev_plan:AnimationPlan=None):
+    """ animates objects, returning the moved objects and the frame of their last keyframes """
+    for _ in iter_animate_objects(ag, objects_to_move, plan, cur_frame, loc_interpolation_mode, rot_interpolation_mode, prev_plan):
+        pass
+    return list(plan.objects), get_last_frame(ag, plan, cur_frame)
+
+
+def iter_animate_objects(ag, objects_to_move:list[Object], plan:AnimationPlan, cur_frame:int, loc_interpolation_mode:str="LINEAR", rot_interpolation_mode:str="LINEAR", prev_plan:AnimationPlan=None, before_write=None):
+    """ animates objects layer by layer, yielding progress (0-1) after each layer
+
+    prev_plan and before_write are only supported with fast keying (see 'iter_animate_objects_in_bulk')
+
+    """
+    if ag.use_loose_parts:
+        yield from iter_animate_loose_parts(ag, plan, cur_frame)
+        return
+    if ag.use_instances:
+        yield from iter_animate_instances(ag, plan, cur_frame)
+        return
+    if ag.use_drivers:
+        yield from iter_animate_objects_with_drivers(ag, plan, cur_frame, loc_interpolation_mode, rot_interpolation_mode)
+        return
+    if ag.use_shared_actions:
+        yield from iter_animate_objects_shared(ag, plan, cur_frame, loc_interpolation_mode, rot_interpolation_mode)
+        return
+    if ag.use_fast_keying:
+        yield from iter_animate_objects_in_bulk(ag, plan, cur_frame, loc_interpolation_mode, rot_interpolation_mode, prev_plan, before_write)
+        return
+
+    # initialize variables for use in layer loop
     objects_moved = []
     last_len_objects_moved = 0
     mult = 1 if ag.build_type == "ASSEMBLE" else -1
-    inc  = 1 if ag.build_type == "ASSEMBLE" else 0
     velocity = get_object_velocity(ag)
+    build_speed = get_build_speed(ag)
     orig_frame = cur_frame
     insert_loc = any(ag.loc_offset) or ag.loc_random != 0
     insert_rot = any(ag.rot_offset) or ag.rot_random != 0
-    layer_height = ag.layer_height
-    inverted_build = ag.inverted_build
-    skip_empty_selections = ag.skip_empty_selections
-    kf_idx_loc = -1
-    kf_idx_rot = -1
-    last_lower_bound = None
-
-    # insert first location keyframes
-    if insert_loc:
-        insert_keyframes(objects_to_move, "location", cur_frame + mult)
-    # insert first rotation keyframes
-    if insert_rot:
-        insert_keyframes(objects_to_move, "rotation_euler", cur_frame + mult)
-
-    while len(objects_to_move) > len(objects_moved):
-        # print status to terminal
-        update_progress_bars(True, True, len(objects_moved) / len(objects_to_move), last_len_objects_moved / len(objects_to_move), "Animating Layers")
-        last_len_objects_moved = len(objects_moved)
-
-        # get next objects to animate
-        new_selection, last_lower_bound = get_new_selection(list_z_values, layer_height, inverted_build, skip_empty_selections, last_lower_bound)
-        objects_moved += new_selection
-
-        # move selected objects and add keyframes
-        kf_idx_loc = -1
-        kf_idx_rot = -1
-        if len(new_selection) != 0:
+    old_actions = [get_action(obj) for obj in objects_to_move]
+    plan.keyed_values = {data_path: np.zeros((len(plan), 4, 3)) for data_path in get_animated_data_paths(ag)}
+
+    with profile_span("keyframe_insert", objects=len(objects_to_move), layers=plan.num_layers) as counts:
+        # insert first location keyframes
+        if insert_loc:
+            insert_keyframes(objects_to_move, "location", cur_frame + mult)
+        # insert first rotation keyframes
+        if insert_rot:
+            insert_keyframes(objects_to_move, "rotation_euler", cur_frame + mult)
+
+        for layer_idx in range(plan.num_layers):
+            # print status to terminal
+            update_progress_bars(True, True, len(objects_moved) / len(objects_to_move), last_len_objects_moved / len(objects_to_move), "Animating Layers")
+            last_len_objects_moved = len(objects_moved)
+
+            # get next objects to animate (empty layers are accounted for by the layer's build step)
+            new_selection = plan.layer_objects(layer_idx)
+            objects_moved += new_selection
+            cur_frame = orig_frame - int(plan.layer_steps[layer_idx]) * build_speed * mult
+
             # insert location keyframes
             if insert_loc:
-                loc_rand = random.uniform(-0.5, 0.5)
+                loc_rand = plan.loc_jitter[layer_idx]
                 insert_keyframes(new_selection, "location", cur_frame + loc_rand)
-                kf_idx_loc -= inc
             # insert rotation keyframes
             if insert_rot:
-                rot_rand = random.uniform(-0.5, 0.5)
+                rot_rand = plan.rot_jitter[layer_idx]
                 insert_keyframes(new_selection, "rotation_euler", cur_frame + rot_rand)
-                kf_idx_rot -= inc
 
             # step cur_frame backwards
             cur_frame -= velocity * mult
 
             # move object and insert location keyframes
+            layer_slice = plan.layer_slice(layer_idx)
             if insert_loc:
-                for obj in new_selection:
-                    if ag.use_global:
-                        obj.matrix_world.translation = get_offset_location(ag, obj.matrix_world.translation)
-                    else:
-                        obj.location = get_offset_location(ag, obj.location)
+                locs = get_object_vectors(new_selection, "location")
+                offset_locs = get_offset_locations(ag, new_selection, locs, plan.loc_noise[layer_slice])
+                for obj, loc in zip(new_selection, offset_locs):
+                    obj.location = loc
+                plan.keyed_values["location"][layer_slice] = np.stack((locs, locs, offset_locs, offset_locs), axis=1)
                 insert_keyframes(new_selection, "location", cur_frame + loc_rand, if_needed=True)
             # rotate object and insert rotation keyframes
             if insert_rot:
-                for obj in new_selection:
-                    # if ag.use_global:
-                    #     # TODO: Fix global rotation functionality
-                    #     # NOTE: Solution 1 - currently limited to at most 360 degrees
-                    #     xr, yr, zr = get_offset_rotation(ag, Vector((0,0,0)))
-                    #     inv_mat = obj.matrix_world.inverted()
-                    #     x_axis = mathutils_mult(inv_mat, Vector((1, 0, 0)))
-                    #     y_axis = mathutils_mult(inv_mat, Vector((0, 1, 0)))
-                    #     z_axis = mathutils_mult(inv_mat, Vector((0, 0, 1)))
-                    #     x_mat = Matrix.Rotation(xr, 4, x_axis)
-                    #     y_mat = Matrix.Rotation(yr, 4, y_axis)
-                    #     z_mat = Matrix.Rotation(zr, 4, z_axis)
-                    #     obj.matrix_local = mathutils_mult(z_mat, y_mat, x_mat, obj.matrix_local)
-                    # else:
-                    obj.rotation_euler = get_offset_rotation(ag, obj.rotation_euler)
+                rots = get_object_vectors(new_selection, "rotation_euler")
+                offset_rots = get_offset_rotations(ag, rots, plan.rot_noise[layer_slice])
+                for obj, rot in zip(new_selection, offset_rots):
+                    obj.rotation_euler = rot
+                plan.keyed_values["rotation_euler"][layer_slice] = np.stack((rots, rots, offset_rots, offset_rots), axis=1)
                 insert_keyframes(new_selection, "rotation_euler", cur_frame + rot_rand, if_needed=True)
 
-            # step cur_frame forwards
-            cur_frame += (velocity - get_build_speed(ag)) * mult
-
-        # handle case where 'ag.skip_empty_selections' == False and empty selection is grabbed
-        elif not ag.skip_empty_selections:
-            # skip frame if nothing selected
-            cur_frame -= get_build_speed(ag) * mult
-        # handle case where 'ag.skip_empty_selections' == True and empty selection is grabbed
-        else:
-            os.stderr.write("Grabbed empty selection. This shouldn't happen!")
-
-    cur_frame -= (velocity - get_build_speed(ag)) * mult
-    # insert final location keyframes
-    if insert_loc:
-        insert_keyframes(objects_to_move, "location", cur_frame)
-    # insert final rotation keyframes
-    if insert_rot:
-        insert_keyframes(objects_to_move, "rotation_euler", cur_frame)
+            yield (layer_idx + 1) / plan.num_layers
+
+        # step cur_frame past the last build step
+        cur_frame = orig_frame - plan.num_steps * build_speed * mult
+        cur_frame -= (velocity - build_speed) * mult
+        # insert final location keyframes
+        if insert_loc:
+            insert_keyframes(objects_to_move, "location", cur_frame)
+        # insert final rotation keyframes
+        if insert_rot:
+            insert_keyframes(objects_to_move, "rotation_euler", cur_frame)
+        counts["keys"] = len(objects_to_move) * 4 * 3 * (insert_loc + insert_rot)
+    tag_new_actions(objects_to_move, old_actions)
+    # record keyed frames (for removing exactly these keyframes on 'Start Over')
+    plan.keyed_frames = {data_path: get_keyframe_frames(ag, plan, orig_frame, plan.get_jitter(data_path)) for data_path in get_animated_data_paths(ag)}
 
     # set interpolation modes for moved objects
     start_frame = cur_frame if ag.build_type == "ASSEMBLE" else orig_frame
     end_frame = orig_frame if ag.build_type == "ASSEMBLE" else cur_frame
-    set_interpolation(objects_moved, "loc", loc_interpolation_mode, start_frame, end_frame)
-    set_interpolation(objects_moved, "rot", rot_interpolation_mode, start_frame, end_frame)
+    with profile_span("interpolation", objects=len(objects_moved)):
+        set_interpolation(objects_moved, "loc", loc_interpolation_mode, start_frame, end_frame)
+        set_interpolation(objects_moved, "rot", rot_interpolation_mode, start_frame, end_frame)
+
+    update_progress_bars(True, True, 1, 0, "Animating Layers", end=True)
+
+
+def get_last_frame(ag, plan:AnimationPlan, orig_frame:int):
+    """ returns frame of the last keyframes (where all objects are offset) for animation starting at orig_frame """
+    mult = 1 if ag.build_type == "ASSEMBLE" else -1
+    build_speed = get_build_speed(ag)
+    return orig_frame - plan.num_steps * build_speed * mult - (get_object_velocity(ag) - build_speed) * mult
+
+
+def get_start_frames(ag, plan:AnimationPlan, orig_frame:int):
+    """ returns frame each object's layer starts animating at (before random jitter) """
+    mult = 1 if ag.build_type == "ASSEMBLE" else -1
+    layer_frames = orig_frame - plan.layer_steps * get_build_speed(ag) * mult
+    return layer_frames[plan.layer_idxs]
+
+
+def get_keyframe_frames(ag, plan:AnimationPlan, orig_frame:int, jitter:np.ndarray):
+    """ returns (n, 4) array of keyframe frames for the objects in plan
+
+    Objects are keyed at the first frame, their layer's start frame (plus
+    the layer's random jitter), the layer start shifted by the object
+    velocity (offset position) and the last frame (offset position).
+
+    """
+    mult = 1 if ag.build_type == "ASSEMBLE" else -1
+    plan.start_frames = get_start_frames(ag, plan, orig_frame)
+    obj_frames = plan.start_frames + jitter[plan.layer_idxs]
+    num_objs = len(plan)
+    return np.column_stack((
+        np.full(num_objs, orig_frame + mult, dtype=np.float64),
+        obj_frames,
+        obj_frames - get_object_velocity(ag) * mult,
+        np.full(num_objs, get_last_frame(ag, plan, orig_frame), dtype=np.float64),
+    ))
+
+
+def iter_animate_objects_in_bulk(ag, plan:AnimationPlan, cur_frame:int, loc_interpolation_mode:str="LINEAR", rot_interpolation_mode:str="LINEAR", prev_plan:AnimationPlan=None, before_write=None):
+    """ animates objects, writing the same keyframes as 'animate_objects' with one bulk write per fcurve
+
+    Yields progress (0-1) after the keyframes of each layer are written.
+
+    If 'prev_plan' (the plan the objects are currently animated with) is
+    passed, only objects whose keyframes differ from the previous schedule
+    are touched: keyframes with new frames but unchanged values are shifted
+    in place, and all others are replaced. Only keyframes of the previous
+    build are replaced, so keyframes set by the user are kept.
+
+    If 'before_write' is passed, it's called with the objects of each layer
+    right before their keyframes are written (e.g. to snapshot them).
+
+    """
+
+    # initialize variables
+    orig_frame = cur_frame
+    num_objs = len(plan)
+    last_frame = get_last_frame(ag, plan, orig_frame)
+    start_frame = last_frame if ag.build_type == "ASSEMBLE" else orig_frame
+    end_frame = orig_frame if ag.build_type == "ASSEMBLE" else last_frame
+    default_interpolation = get_default_interpolation_value()
+    if prev_plan is not None:
+        new_idxs, old_idxs = plan.match_objects(prev_plan)
+
+    plan.schedule = dict()
+    plan.keyed_frames = dict()
+    plan.keyed_values = dict()
+    data_paths = get_animated_data_paths(ag)
+    num_chunks = max(len(data_paths) * plan.num_layers, 1)
+    for data_path_idx, data_path in enumerate(data_paths):
+        # get original and offset values
+        if data_path == "location":
+            orig_values = get_object_vectors(plan.objects, "location")
+            interpolation_mode, jitter = loc_interpolation_mode, plan.loc_jitter
+        else:
+            orig_values = get_object_vectors(plan.objects, "rotation_euler")
+            interpolation_mode, jitter = rot_interpolation_mode, plan.rot_jitter
+        if prev_plan is not None:
+            # already animated objects keep their keyed original values
+            orig_values[new_idxs] = prev_plan.schedule[data_path][1][old_idxs, 0]
+        with profile_span("offset_generation", objects=num_objs):
+            if data_path == "location":
+                offset_values = get_offset_locations(ag, plan.objects, orig_values, plan.loc_noise)
+            else:
+                offset_values = get_offset_rotations(ag, orig_values, plan.rot_noise)
+        frames = get_keyframe_frames(ag, plan, orig_frame, jitter)
+        values = np.stack((orig_values, orig_values, offset_values, offset_values), axis=1)
+        with profile_span("interpolation", objects=num_objs):
+            in_range = (start_frame <= frames) & (frames <= end_frame)
+            interpolations = np.where(in_range, get_interpolation_value(interpolation_mode), default_interpolation)
+        plan.schedule[data_path] = (frames, values, interpolations)
+        plan.keyed_frames[data_path] = frames
+        plan.keyed_values[data_path] = values
+
+        # compare against keyframes from the previous build
+        rewrite = np.ones(num_objs, dtype=bool)
+        retime = np.zeros(num_objs, dtype=bool)
+        keyed_before = np.zeros(num_objs, dtype=bool)
+        old_frames = np.empty_like(frames)
+        old_values = np.empty_like(values)
+        if prev_plan is not None:
+            prev_frames, prev_values, prev_interpolations = prev_plan.schedule[data_path]
+            keyed_before[new_idxs] = True
+            old_frames[new_idxs] = prev_frames[old_idxs]
+            old_values[new_idxs] = prev_values[old_idxs]
+            same_frames = np.all(np.isclose(frames[new_idxs], prev_frames[old_idxs], atol=1e-4), axis=1)
+            same_values = np.all(np.isclose(values[new_idxs], prev_values[old_idxs], atol=1e-6), axis=(1, 2))
+            same_interpolations = np.all(interpolations[new_idxs] == prev_interpolations[old_idxs], axis=1)
+            unchanged_keys = same_values & same_interpolations
+            rewrite[new_idxs] = ~unchanged_keys
+            retime[new_idxs] = unchanged_keys & ~same_frames
+
+        # write keyframes for each object, layer by layer
+        with profile_span("keyframe_insert", data_path=data_path, layers=plan.num_layers) as counts:
+            for layer_idx in range(plan.num_layers):
+                update_progress_bars(True, True, layer_idx / plan.num_layers, max(layer_idx - 1, 0) / plan.num_layers, "Animating Layers")
+                start, end = plan.layer_range(layer_idx)
+                idxs = np.flatnonzero(rewrite[start:end] | retime[start:end]) + start
+                if before_write is not None:
+                    before_write([plan.objects[i] for i in idxs])
+                for i in idxs:
+                    obj = plan.objects[i]
+                    for axis in range(3):
+                        fcurve = ensure_fcurve(obj, data_path, axis)
+                        if retime[i]:
+                            retime_keyframes(fcurve, old_frames[i], frames[i], values[i, :, axis])
+                        elif keyed_before[i]:
+                            # only replace the keyframes of the previous build (user keyframes are kept)
+                            replace_keyframes(fcurve, old_frames[i], old_values[i, :, axis], frames[i], values[i, :, axis], interpolations[i])
+                        else:
+                            add_keyframes(fcurve, frames[i], values[i, :, axis], interpolations[i])
+                yield (data_path_idx * plan.num_layers + layer_idx + 1) / num_chunks
+            counts["objects"] = int(np.count_nonzero(rewrite | retime))
+            counts["keys"] = int(np.count_nonzero(rewrite)) * frames.shape[1] * 3
+            counts["keys_moved"] = int(np.count_nonzero(retime & ~rewrite)) * frames.shape[1] * 3
+
+    update_progress_bars(True, True, 1, 0, "Animating Layers", end=True)
+
+
+def get_delta_offsets(ag, plan:AnimationPlan, data_path:str, use_random:bool=True):
+    """ returns (deltas, offsets): (n, 3) arrays of the objects' delta transforms for data_path and the offsets to add to them (without the random part if not use_random) """
+    if data_path == "delta_location":
+        orig_values = get_object_vectors(plan.objects, "location")
+        noise = plan.loc_noise if use_random else np.zeros_like(orig_values)
+        with profile_span("offset_generation", objects=len(plan)):
+            offset_values = get_offset_locations(ag, plan.objects, orig_values, noise)
+    else:
+        orig_values = get_object_vectors(plan.objects, "rotation_euler")
+        noise = plan.rot_noise if use_random else np.zeros_like(orig_values)
+        with profile_span("offset_generation", objects=len(plan)):
+            offset_values = get_offset_rotations(ag, orig_values, noise)
+    return get_object_vectors(plan.objects, data_path), offset_values - orig_values
+
+
+def iter_animate_objects_shared(ag, plan:AnimationPlan, cur_frame:int, loc_interpolation_mode:str="LINEAR", rot_interpolation_mode:str="LINEAR"):
+    """ animates delta transforms of objects, sharing one action between objects with the same keyframes
+
+    The common (non-random) offsets of objects in the same layer give them
+    identical keyframes, so they're assigned one action between them
+    instead of an action each. Each object's random offset is added by
+    drivers on its location/rotation (see 'build_drivers'), timed like the
+    keyframes. Objects with animation of their own are keyed with their
+    full offsets in their own action. Yields progress (0-1) after each layer.
+
+    """
+
+    # initialize variables
+    orig_frame = cur_frame
+    num_objs = len(plan)
+    last_frame = get_last_frame(ag, plan, orig_frame)
+    start_frame = last_frame if ag.build_type == "ASSEMBLE" else orig_frame
+    end_frame = orig_frame if ag.build_type == "ASSEMBLE" else last_frame
+    default_interpolation = get_default_interpolation_value()
+    old_actions = [get_action(obj) for obj in plan.objects]
+    has_own_action = np.array([action is not None for action in old_actions], dtype=bool)
+
+    plan.schedule = None
+    plan.keyed_frames = dict()
+    plan.keyed_values = dict()
+    keyframes = dict()
+    random_offsets = dict()
+    expressions = dict()
+    for data_path in get_animated_data_paths(ag):
+        interpolation_mode = loc_interpolation_mode if data_path == "delta_location" else rot_interpolation_mode
+        deltas, offsets = get_delta_offsets(ag, plan, data_path)
+        frames = get_keyframe_frames(ag, plan, orig_frame, plan.get_jitter(data_path))
+        if (ag.loc_random if data_path == "delta_location" else ag.rot_random) != 0:
+            # key common offsets only, leaving the random part to drivers (objects with their own action key it all)
+            common_offsets = get_delta_offsets(ag, plan, data_path, use_random=False)[1]
+            random_offsets[data_path[len("delta_"):]] = np.where(has_own_action[:, None], 0, offsets - common_offsets)
+            expressions[data_path[len("delta_"):]] = get_build_expression(interpolation_mode, ag.build_type)
+            offsets = np.where(has_own_action[:, None], offsets, common_offsets)
+        offset_deltas = deltas + offsets
+        values = np.stack((deltas, deltas, offset_deltas, offset_deltas), axis=1)
+        with profile_span("interpolation", objects=num_objs):
+            in_range = (start_frame <= frames) & (frames <= end_frame)
+            interpolations = np.where(in_range, get_interpolation_value(interpolation_mode), default_interpolation)
+        keyframes[data_path] = (frames, values, interpolations)
+        plan.keyed_frames[data_path] = frames
+        plan.keyed_values[data_path] = values
+    if len(keyframes) == 0:
+        return
+    plan.driven = len(random_offsets) > 0
+    timing = get_build_timing(ag, plan)
+    base_values = {data_path: get_object_vectors(plan.objects, data_path) for data_path in random_offsets}
+
+    # group objects in the same layer with the same keyframe values (frames and interpolations only vary by layer)
+    own_actions = np.where(has_own_action, np.arange(num_objs), -1)
+    group_keys = np.column_stack([plan.layer_idxs, own_actions] + [np.round(values.reshape(num_objs, -1), 6) for _, values, _ in keyframes.values()])
+    group_idxs = np.unique(group_keys, axis=0, return_inverse=True)[1].reshape(-1)
+
+    # key the first object of each group and assign its action to the rest
+    group_actions = dict()
+    with profile_span("keyframe_insert", objects=num_objs, layers=plan.num_layers) as counts:
+        for layer_idx in range(plan.num_layers):
+            update_progress_bars(True, True, layer_idx / plan.num_layers, max(layer_idx - 1, 0) / plan.num_layers, "Animating Layers")
+            start, end = plan.layer_range(layer_idx)
+            for i in range(start, end):
+                obj = plan.objects[i]
+                if plan.driven and not has_own_action[i]:
+                    obj_offsets = {data_path: (base_values[data_path][i], random_offsets[data_path][i]) for data_path in random_offsets}
+                    add_build_drivers(obj, timing[i], obj_offsets, expressions)
+                action = group_actions.get(group_idxs[i])
+                if action is not None:
+                    assign_action(obj, action)
+                    continue
+                if old_actions[i] is None:
+                    action = bpy.data.actions.new("%s_layer_%d" % (ag.name, layer_idx))
+                    action[ACTION_TAG] = True
+                    assign_action(obj, action)
+                elif old_actions[i].users > 1:
+                    # don't key into an action other objects are animated with
+                    action = old_actions[i].copy()
+                    action[ACTION_TAG] = True
+                    assign_action(obj, action)
+                for data_path, (frames, values, interpolations) in keyframes.items():
+                    for axis in range(3):
+                        add_keyframes(ensure_fcurve(obj, data_path, axis), frames[i], values[i, :, axis], interpolations[i])
+                group_actions[group_idxs[i]] = get_action(obj)
+            yield (layer_idx + 1) / plan.num_layers
+        counts["actions"] = len(group_actions)
+        counts["keys"] = len(group_actions) * len(keyframes) * 4 * 3
+        counts["drivers"] = int(np.count_nonzero(~has_own_action)) * len(expressions) * 3 if plan.driven else 0
 
     update_progress_bars(True, True, 1, 0, "Animating Layers", end=True)
 
-    return objects_moved, cur_frame
+
+def get_build_timing(ag, plan:AnimationPlan):
+    """ returns (n, 3) array of [location start frame, rotation start frame, duration] of each object's move (see 'build_drivers') """
+    timing = np.zeros((len(plan), 3))
+    timing[:, 2] = get_object_velocity(ag)
+    for data_path, frames in plan.keyed_frames.items():
+        # moves start at the earlier of the layer start and offset keyframes
+        timing[:, START_IDXS[data_path]] = frames[:, 1:3].min(axis=1)
+    return timing
+
+
+def iter_animate_objects_with_drivers(ag, plan:AnimationPlan, cur_frame:int, loc_interpolation_mode:str="LINEAR", rot_interpolation_mode:str="LINEAR"):
+    """ animates delta transforms of objects with drivers instead of keyframes
+
+    Each object stores its start frames and offsets in custom properties,
+    which drivers sharing one expression per channel turn into its
+    transform at the current frame. Retiming only rewrites the start frames
+    (see 'set_build_timing'). Yields progress (0-1) after each layer.
+
+    """
+
+    # initialize variables
+    orig_frame = cur_frame
+    plan.schedule = None
+    plan.driven = True
+    plan.keyed_frames = dict()
+    plan.keyed_values = None
+    offsets = dict()
+    expressions = dict()
+    for data_path in get_animated_data_paths(ag):
+        interpolation_mode = loc_interpolation_mode if data_path == "delta_location" else rot_interpolation_mode
+        offsets[data_path] = get_delta_offsets(ag, plan, data_path)
+        expressions[data_path] = get_build_expression(interpolation_mode, ag.build_type)
+        # frames the keyframes would be at (for retiming and the visualizer)
+        plan.keyed_frames[data_path] = get_keyframe_frames(ag, plan, orig_frame, plan.get_jitter(data_path))
+    if len(expressions) == 0:
+        return
+    timing = get_build_timing(ag, plan)
+
+    with profile_span("driver_insert", objects=len(plan), layers=plan.num_layers) as counts:
+        for layer_idx in range(plan.num_layers):
+            update_progress_bars(True, True, layer_idx / plan.num_layers, max(layer_idx - 1, 0) / plan.num_layers, "Animating Layers")
+            start, end = plan.layer_range(layer_idx)
+            for i in range(start, end):
+                obj_offsets = {data_path: (deltas[i], delta_offsets[i]) for data_path, (deltas, delta_offsets) in offsets.items()}
+                add_build_drivers(plan.objects[i], timing[i], obj_offsets, expressions)
+            yield (layer_idx + 1) / plan.num_layers
+        counts["drivers"] = len(plan) * len(expressions) * 3
+
+    update_progress_bars(True, True, 1, 0, "Animating Layers", end=True)
+
+
+def get_instance_animation_plan(ag):
+    """ returns AnimationPlan for the points of ag's instance build (see 'instance_build'), named by point index """
+    with profile_span("read_locations") as counts:
+        locs = get_instance_locations(ag)
+        counts["points"] = len(locs)
+    plan = get_plan_for_locations(ag, [str(i) for i in range(len(locs))], locs)
+    instancer = ag.instance_object or ag.instancer
+    # the converted instancer is only named once it's created (see 'iter_animate_instances')
+    plan.instancer = "" if instancer is None else instancer.name
+    return plan
+
+
+def iter_animate_instances(ag, plan:AnimationPlan, cur_frame:int):
+    """ animates the points of an instancer with a Geometry Nodes modifier instead of objects
+
+    Each point stores its start frames and offsets in attributes, which the
+    build modifier turns into its instance's transform at the current frame.
+    Retiming only rewrites the start frames (see 'set_instance_timing').
+    All points are written in bulk, so progress is only yielded once.
+
+    """
+    instancer = ensure_instancer(ag)
+    plan.instancer = instancer.name
+    loc_offsets, rot_offsets = get_point_offsets(ag, plan, cur_frame)
+    with profile_span("attribute_write", points=len(plan)):
+        set_instance_build(ag, instancer, plan.point_idxs, get_build_timing(ag, plan), loc_offsets, rot_offsets)
+    yield 1
+
+
+def get_point_offsets(ag, plan:AnimationPlan, orig_frame:int):
+    """ returns (loc_offsets, rot_offsets): (n, 3) arrays of the offsets of plan's points (or loose parts), recording their frames in plan.keyed_frames """
+    plan.schedule = None
+    plan.keyed_frames = dict()
+    plan.keyed_values = None
+    offsets = {"delta_location": np.zeros((len(plan), 3)), "delta_rotation_euler": np.zeros((len(plan), 3))}
+    with profile_span("offset_generation", objects=len(plan)):
+        for data_path in get_animated_data_paths(ag):
+            if data_path == "delta_location":
+                offsets[data_path] = get_offset_locations(ag, plan.objects, np.zeros((len(plan), 3)), plan.loc_noise)
+            else:
+                offsets[data_path] = get_offset_rotations(ag, np.zeros((len(plan), 3)), plan.rot_noise)
+            # frames the keyframes would be at (for retiming and the visualizer)
+            plan.keyed_frames[data_path] = get_keyframe_frames(ag, plan, orig_frame, plan.get_jitter(data_path))
+    return offsets["delta_location"], offsets["delta_rotation_euler"]
+
+
+def get_loose_part_animation_plan(ag):
+    """ returns AnimationPlan for the loose parts of ag's parts object (see 'loose_parts'), named by part index """
+    with profile_span("read_locations") as counts:
+        locs = get_loose_part_locations(ag)
+        counts["parts"] = len(locs)
+    plan = get_plan_for_locations(ag, [str(i) for i in range(len(locs))], locs)
+    plan.instancer = get_parts_object(ag).name
+    return plan
+
+
+def iter_animate_loose_parts(ag, plan:AnimationPlan, cur_frame:int):
+    """ animates the loose parts of a single mesh with a Geometry Nodes modifier instead of objects
+
+    Like 'iter_animate_instances', but each vertex stores the start frames
+    and offsets of its loose part, so the mesh never has to be split into
+    objects. Progress is only yielded once.
+
+    """
+    obj = bpy.data.objects[plan.instancer]
+    loc_offsets, rot_offsets = get_point_offsets(ag, plan, cur_frame)
+    with profile_span("attribute_write", parts=len(plan), points=len(obj.data.vertices)):
+        set_loose_part_build(ag, obj, plan.point_idxs, get_build_timing(ag, plan), loc_offsets, rot_offsets)
+    yield 1
 
 
 @blender_version_wrapper("<=", "2.79")
@@ -391,3 +761,11 @@ def match_properties(ag_new, ag_old):
     ag_new.build_type = ag_old.build_type
     ag_new.inverted_build = ag_old.inverted_build
     ag_new.use_global = ag_old.use_global
+    ag_new.random_seed = ag_old.random_seed
+    ag_new.use_fast_keying = ag_old.use_fast_keying
+    ag_new.use_shared_actions = ag_old.use_shared_actions
+    ag_new.use_drivers = ag_old.use_drivers
+    ag_new.use_instances = ag_old.use_instances
+    ag_new.instancer = ag_old.instancer
+    ag_new.use_loose_parts = ag_old.use_loose_parts
+    ag_new.parts_object = ag_old.parts_object
@@ -0,0 +1,324 @@
+# Copyright (C) 2025 Christopher Gearhart
+# chris@bricksbroughttolife.com
+# http://bricksbroughttolife.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# System imports
+import numpy as np
+
+# Blender imports
+import bpy
+from bpy.types import Object
+
+# Module imports
+# NONE!
+
+BUILD_MODIFIER = "AssemblMe Build"
+NODE_GROUP_NAME = "AssemblMe Build Instances"
+# per-point attributes written by the build (read by the node group)
+BUILD_ATTRIBUTES = ("build_frame", "rot_build_frame", "loc_offset", "rot_offset")
+# instance scale read by the node group (copied from the instancer's own 'scale' attribute, if any)
+SCALE_ATTRIBUTE = "assemblme_scale"
+# map range interpolation approximating each keyframe interpolation mode
+MAP_RANGE_MODES = {"CONSTANT": "STEPPED", "LINEAR": "LINEAR"}
+
+
+def get_mesh_transforms(collection):
+    """ returns (objects, locations, rotations, scales) of the mesh objects in collection (transforms as (n, 3) world space arrays)
+
+    Matrices are read in one bulk call and decomposed into XYZ euler
+    rotations and (possibly negative) scales with numpy.
+
+    """
+    all_objects = collection.all_objects
+    mats = np.empty(len(all_objects) * 16, dtype=np.float32)
+    all_objects.foreach_get("matrix_world", mats)
+    mask = np.fromiter((obj.type == "MESH" for obj in all_objects), dtype=bool, count=len(all_objects))
+    objects = [obj for obj, is_mesh in zip(all_objects, mask) if is_mesh]
+    # matrices are flattened column-major
+    mats = mats.reshape(-1, 4, 4).transpose(0, 2, 1)[mask].astype(np.float64)
+    locs = mats[:, :3, 3]
+    scales = np.linalg.norm(mats[:, :3, :3], axis=1)
+    scales[:, 0] *= np.where(np.linalg.det(mats[:, :3, :3]) < 0, -1, 1)
+    rot_mats = mats[:, :3, :3] / np.where(scales == 0, 1, scales)[:, None, :]
+    # XYZ euler angles of the rotation matrices (z is folded into x for gimbal locked matrices)
+    cos_y = np.hypot(rot_mats[:, 0, 0], rot_mats[:, 1, 0])
+    locked = cos_y < 1e-6
+    rots = np.column_stack((
+        np.where(locked, np.arctan2(-rot_mats[:, 1, 2], rot_mats[:, 1, 1]), np.arctan2(rot_mats[:, 2, 1], rot_mats[:, 2, 2])),
+        np.arctan2(-rot_mats[:, 2, 0], cos_y),
+        np.where(locked, 0, np.arctan2(rot_mats[:, 1, 0], rot_mats[:, 0, 0])),
+    ))
+    return objects, locs, rots, scales
+
+
+def set_point_attribute(mesh, name:str, data_type:str, values:np.ndarray):
+    """ write per-point attribute in bulk (replacing an existing attribute of another type or domain) """
+    attr = mesh.attributes.get(name)
+    if attr is not None and (attr.data_type != data_type or attr.domain != "POINT"):
+        mesh.attributes.remove(attr)
+        attr = None
+    if attr is None:
+        attr = mesh.attributes.new(name, data_type, "POINT")
+    dtype = np.int32 if data_type == "INT" else np.float32
+    attr.data.foreach_set("vector" if data_type == "FLOAT_VECTOR" else "value", np.ascontiguousarray(values, dtype=dtype).ravel())
+
+
+def get_point_scales(mesh):
+    """ returns (n, 3) array of the mesh's 'scale' point attribute (ones where it has none) """
+    num_points = len(mesh.vertices)
+    attr = mesh.attributes.get("scale")
+    if attr is None or attr.data_type != "FLOAT_VECTOR" or attr.domain != "POINT":
+        return np.ones((num_points, 3))
+    scales = np.empty(num_points * 3, dtype=np.float32)
+    attr.data.foreach_get("vector", scales)
+    return scales.reshape(num_points, 3)
+
+
+def get_instancer_locations(instancer:Object, use_global:bool):
+    """ returns (n, 3) array of the instancer's point locations """
+    mesh = instancer.data
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    locs = co.reshape(-1, 3).astype(np.float64)
+    if use_global:
+        mat = np.array(instancer.matrix_world)
+        locs = locs @ mat[:3, :3].T + mat[:3, 3]
+    return locs
+
+
+def get_instance_locations(ag):
+    """ returns (n, 3) array of the locations of the points ag's instance build animates (without creating the instancer) """
+    instancer = ag.instance_object or ag.instancer
+    if instancer is not None:
+        return get_instancer_locations(instancer, ag.use_global)
+    # points are converted from the mesh objects in this order (see 'ensure_instancer')
+    return get_mesh_transforms(ag.collection)[1]
+
+
+def ensure_instancer(ag):
+    """ returns object to animate the instances of: ag.instancer, or points converted from the objects in ag.collection
+
+    Converted collections are instanced from a collection of prototypes (one
+    object per unique mesh), and the original collection is hidden.
+
+    """
+    if ag.instancer is not None:
+        ag.instance_object = ag.instancer
+        return ag.instancer
+    remove_instance_build(ag)
+    objects, locs, rots, scales = get_mesh_transforms(ag.collection)
+    # instance one prototype per mesh (in the alphabetical order 'Collection Info' separates children in)
+    proto_idxs = dict()
+    instance_idxs = np.fromiter((proto_idxs.setdefault(obj.data, len(proto_idxs)) for obj in objects), dtype=np.int32, count=len(objects))
+    prototypes = bpy.data.collections.new(ag.name + "_prototypes")
+    for mesh, i in proto_idxs.items():
+        prototypes.objects.link(bpy.data.objects.new("%s_proto_%06d" % (ag.name, i), mesh))
+    # write points
+    mesh = bpy.data.meshes.new(ag.name + "_points")
+    mesh.vertices.add(len(objects))
+    mesh.vertices.foreach_set("co", locs.astype(np.float32).ravel())
+    set_point_attribute(mesh, "instance_index", "INT", instance_idxs)
+    set_point_attribute(mesh, "rotation", "FLOAT_VECTOR", rots)
+    set_point_attribute(mesh, SCALE_ATTRIBUTE, "FLOAT_VECTOR", scales)
+    instancer = bpy.data.objects.new(ag.name + "_instances", mesh)
+    ag.id_data.collection.objects.link(instancer)
+    modifier = instancer.modifiers.new(BUILD_MODIFIER, "NODES")
+    modifier.node_group = get_build_node_group(ag.loc_interpolation_mode, ag.rot_interpolation_mode, ag.build_type)
+    set_modifier_input(modifier, "Prototypes", prototypes)
+    ag.collection.hide_viewport = True
+    ag.collection.hide_render = True
+    ag.instance_object = instancer
+    return instancer
+
+
+def get_build_node_group(loc_interpolation_mode:str, rot_interpolation_mode:str, build_type:str):
+    """ returns node group instancing prototypes on points and moving them from their build attributes (shared by builds with the same settings) """
+    name = get_node_group_name(NODE_GROUP_NAME, loc_interpolation_mode, rot_interpolation_mode, build_type)
+    node_group = bpy.data.node_groups.get(name)
+    if node_group is not None:
+        return node_group
+    node_group = new_build_node_group(name, ("Prototypes", "NodeSocketCollection"))
+    group_input = node_group.nodes["Group Input"]
+    links = node_group.links
+    # instance prototypes on the points (with their original rotation and scale)
+    collection_info = new_node(node_group, "GeometryNodeCollectionInfo", 1, 1)
+    collection_info.transform_space = "ORIGINAL"
+    collection_info.inputs["Separate Children"].default_value = True
+    collection_info.inputs["Reset Children"].default_value = True
+    links.new(group_input.outputs["Prototypes"], collection_info.inputs["Collection"])
+    instance_on_points = new_node(node_group, "GeometryNodeInstanceOnPoints", 2, 0)
+    instance_on_points.inputs["Pick Instance"].default_value = True
+    links.new(group_input.outputs["Geometry"], instance_on_points.inputs["Points"])
+    links.new(collection_info.outputs["Instances"], instance_on_points.inputs["Instance"])
+    links.new(new_named_attribute(node_group, "instance_index", "INT", 1, 2), instance_on_points.inputs["Instance Index"])
+    links.new(new_named_attribute(node_group, "rotation", "FLOAT_VECTOR", 1, 3), instance_on_points.inputs["Rotation"])
+    links.new(new_named_attribute(node_group, SCALE_ATTRIBUTE, "FLOAT_VECTOR", 1, 4), instance_on_points.inputs["Scale"])
+    # move instances by the remaining part of their offsets
+    translate = new_node(node_group, "GeometryNodeTranslateInstances", 5, 0)
+    translate.inputs["Local Space"].default_value = False
+    links.new(instance_on_points.outputs["Instances"], translate.inputs["Instances"])
+    links.new(new_build_offset(node_group, "build_frame", "loc_offset", loc_interpolation_mode, build_type, 3), translate.inputs["Translation"])
+    # rotation offsets are in local space (like keyframed rotation offsets)
+    rotate = new_node(node_group, "GeometryNodeRotateInstances", 8, 0)
+    rotate.inputs["Local Space"].default_value = True
+    links.new(translate.outputs["Instances"], rotate.inputs["Instances"])
+    links.new(new_build_offset(node_group, "rot_build_frame", "rot_offset", rot_interpolation_mode, build_type, 6), rotate.inputs["Rotation"])
+    links.new(rotate.outputs["Instances"], node_group.nodes["Group Output"].inputs["Geometry"])
+    return node_group
+
+
+def get_node_group_name(prefix:str, loc_interpolation_mode:str, rot_interpolation_mode:str, build_type:str):
+    loc_mode = MAP_RANGE_MODES.get(loc_interpolation_mode, "SMOOTHSTEP")
+    rot_mode = MAP_RANGE_MODES.get(rot_interpolation_mode, "SMOOTHSTEP")
+    return "%s (%s, %s, %s)" % (prefix, loc_mode.title(), rot_mode.title(), build_type.title())
+
+
+def new_build_node_group(name:str, *inputs):
+    """ returns new geometry node group with a geometry input/output, the given extra (name, socket type) inputs and a Duration input """
+    node_group = bpy.data.node_groups.new(name, "GeometryNodeTree")
+    node_group.interface.new_socket("Geometry", in_out="INPUT", socket_type="NodeSocketGeometry")
+    for socket_name, socket_type in inputs:
+        node_group.interface.new_socket(socket_name, in_out="INPUT", socket_type=socket_type)
+    node_group.interface.new_socket("Duration", in_out="INPUT", socket_type="NodeSocketFloat")
+    node_group.interface.new_socket("Geometry", in_out="OUTPUT", socket_type="NodeSocketGeometry")
+    new_node(node_group, "NodeGroupInput", 0, 0)
+    new_node(node_group, "NodeGroupOutput", 10, 0)
+    return node_group
+
+
+def new_node(node_group, node_type:str, x:int, y:int):
+    """ add node to node_group at column x, row y """
+    node = node_group.nodes.new(node_type)
+    node.location = (x * 200, y * -200)
+    return node
+
+
+def new_named_attribute(node_group, name:str, data_type:str, x:int, y:int):
+    """ add named attribute node to node_group, returning its attribute output """
+    node = new_node(node_group, "GeometryNodeInputNamedAttribute", x, y)
+    node.data_type = data_type
+    node.inputs["Name"].default_value = name
+    return node.outputs["Attribute"]
+
+
+def new_build_offset(node_group, frame_attr:str, offset_attr:str, interpolation_mode:str, build_type:str, x:int):
+    """ add nodes scaling offset_attr by the progress through each element's move (from frame_attr for Duration frames), returning the output
+
+    Progress is mapped to the remaining part of the offset, so moves ease
+    like their keyframe interpolation (see 'MAP_RANGE_MODES').
+
+    """
+    nodes, links = node_group.nodes, node_group.links
+    group_input = nodes["Group Input"]
+    start_frame = new_named_attribute(node_group, frame_attr, "FLOAT", x, 2)
+    end_frame = new_node(node_group, "ShaderNodeMath", x + 1, 3)
+    end_frame.operation = "ADD"
+    links.new(start_frame, end_frame.inputs[0])
+    links.new(group_input.outputs["Duration"], end_frame.inputs[1])
+    progress = new_node(node_group, "ShaderNodeMapRange", x + 1, 2)
+    progress.data_type = "FLOAT"
+    progress.interpolation_type = MAP_RANGE_MODES.get(interpolation_mode, "SMOOTHSTEP")
+    progress.clamp = True
+    links.new(new_node(node_group, "GeometryNodeInputSceneTime", x, 3).outputs["Frame"], progress.inputs["Value"])
+    links.new(start_frame, progress.inputs["From Min"])
+    links.new(end_frame.outputs[0], progress.inputs["From Max"])
+    progress.inputs["To Min"].default_value = 1 if build_type == "ASSEMBLE" else 0
+    progress.inputs["To Max"].default_value = 0 if build_type == "ASSEMBLE" else 1
+    progress.inputs["Steps"].default_value = 1
+    offset = new_node(node_group, "ShaderNodeVectorMath", x + 2, 1)
+    offset.operation = "SCALE"
+    links.new(new_named_attribute(node_group, offset_attr, "FLOAT_VECTOR", x + 1, 1), offset.inputs[0])
+    links.new(progress.outputs["Result"], offset.inputs["Scale"])
+    return offset.outputs["Vector"]
+
+
+def set_modifier_input(modifier, name:str, value):
+    modifier[modifier.node_group.interface.items_tree[name].identifier] = value
+
+
+def set_instance_build(ag, instancer:Object, point_idxs:np.ndarray, timing:np.ndarray, loc_offsets:np.ndarray, rot_offsets:np.ndarray):
+    """ write build attributes for instancer's points and (re)configure its build modifier
+
+    Keyword arguments:
+    ag          -- animated collection settings
+    instancer   -- object with the points to animate
+    point_idxs  -- point index of each row of the other arrays
+    timing      -- (n, 3) array of [location start frame, rotation start frame, duration] (see 'get_build_timing')
+    loc_offsets -- (n, 3) array of location offsets
+    rot_offsets -- (n, 3) array of rotation offsets
+
+    """
+    mesh = instancer.data
+    num_points = len(mesh.vertices)
+    if ag.use_global:
+        loc_offsets = get_local_offsets(instancer, loc_offsets)
+    for name, values in (("loc_offset", loc_offsets), ("rot_offset", rot_offsets)):
+        point_values = np.zeros((num_points, 3))
+        point_values[point_idxs] = values
+        set_point_attribute(mesh, name, "FLOAT_VECTOR", point_values)
+    modifier = instancer.modifiers.get(BUILD_MODIFIER) or instancer.modifiers.new(BUILD_MODIFIER, "NODES")
+    modifier.node_group = get_build_node_group(ag.loc_interpolation_mode, ag.rot_interpolation_mode, ag.build_type)
+    if instancer == ag.instancer:
+        # converted instancers already hold the scales of the objects they replace (see 'ensure_instancer')
+        set_point_attribute(mesh, SCALE_ATTRIBUTE, "FLOAT_VECTOR", get_point_scales(mesh))
+        set_modifier_input(modifier, "Prototypes", ag.collection)
+    set_instance_timing(instancer, point_idxs, timing)
+
+
+def get_local_offsets(obj:Object, offsets:np.ndarray):
+    """ returns (n, 3) array of world space offsets mapped into obj's local space (the space its geometry nodes work in) """
+    mat = np.array(obj.matrix_world)[:3, :3]
+    return offsets @ np.linalg.pinv(mat).T
+
+
+def set_instance_timing(instancer:Object, point_idxs:np.ndarray, timing:np.ndarray):
+    """ update build timing of instancer's points (retimes their animation without touching the offsets) """
+    mesh = instancer.data
+    num_points = len(mesh.vertices)
+    for name, column in (("build_frame", 0), ("rot_build_frame", 1)):
+        point_values = np.zeros(num_points)
+        point_values[point_idxs] = timing[:, column]
+        set_point_attribute(mesh, name, "FLOAT", point_values)
+    if len(timing) > 0:
+        set_modifier_input(instancer.modifiers[BUILD_MODIFIER], "Duration", float(timing[0, 2]))
+    mesh.update()
+    instancer.update_tag()
+
+
+def remove_instance_build(ag):
+    """ remove the build modifier and attributes from ag's instancer (or the converted points and their prototypes) """
+    instancer = ag.instance_object
+    if instancer is None:
+        return
+    modifier = instancer.modifiers.get(BUILD_MODIFIER)
+    if instancer == ag.instancer:
+        if modifier is not None:
+            instancer.modifiers.remove(modifier)
+        for name in BUILD_ATTRIBUTES + (SCALE_ATTRIBUTE,):
+            attr = instancer.data.attributes.get(name)
+            if attr is not None:
+                instancer.data.attributes.remove(attr)
+    else:
+        prototypes = None if modifier is None else modifier[modifier.node_group.interface.items_tree["Prototypes"].identifier]
+        mesh = instancer.data
+        bpy.data.objects.remove(instancer)
+        bpy.data.meshes.remove(mesh)
+        if prototypes is not None:
+            bpy.data.batch_remove(list(prototypes.objects) + [prototypes])
+        if ag.collection is not None:
+            ag.collection.hide_viewport = False
+            ag.collection.hide_render = False
+    ag.instance_object = None
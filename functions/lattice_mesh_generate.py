@@ -22,22 +22,34 @@ import numpy as np
 # Blender imports
 import bpy
 import bmesh
+from bpy.types import Mesh
 from mathutils import Matrix, Vector
 
 # Module imports
 from .common import *
 
-def generate_lattice(vert_dist:Vector, scale:Vector, offset:Vector=Vector((0, 0, 0)), extra_res:int=0, visualize:bool=False):
-    """ return lattice coordinate matrix surrounding object of size 'scale'
+# lattice (coords, edges) arrays by lattice settings (oldest are dropped first)
+lattice_cache = dict()
+LATTICE_CACHE_SIZE = 8
+
+
+def get_lattice_key(vert_dist:Vector, scale:Vector, offset:Vector, extra_res:int):
+    return (tuple(vert_dist), tuple(scale), tuple(offset), extra_res)
+
+
+def get_lattice_arrays(vert_dist:Vector, scale:Vector, offset:Vector=Vector((0, 0, 0)), extra_res:int=0):
+    """ returns (coords, edges) arrays of lattice surrounding object of size 'scale' (cached by lattice settings)
 
     Keyword arguments:
     vert_dist  -- distance between lattice verts in 3D space
     scale     -- lattice scale in 3D space
     offset    -- offset lattice center from origin
     extra_res -- additional resolution to add to ends of lattice
-    visualize -- draw lattice coordinates in 3D space
 
     """
+    key = get_lattice_key(vert_dist, scale, offset, extra_res)
+    if key in lattice_cache:
+        return lattice_cache[key]
 
     # calculate res of lattice
     res = Vector((scale.x / vert_dist.x,
@@ -45,24 +57,47 @@ def generate_lattice(vert_dist:Vector, scale:Vector, offset:Vector=Vector((0, 0,
                   scale.z / vert_dist.z))
     # round up lattice res
     res = Vector(round_up(round(val), 2) for val in res)
-    h_res = res / 2
-    # populate coord matrix
-    nx, ny, nz = round(res[0]) - 1 + extra_res, round(res[1]) - 1 + extra_res, round(res[2]) - 1 + extra_res
-    create_coord = lambda v: vec_mult(v - h_res, vert_dist) + offset
-    coord_matrix = [[[create_coord(Vector((x, y, z))) for z in range(nz)] for y in range(ny)] for x in range(nx)]
+    h_res = np.array(res) / 2
+    # populate coords (verts are ordered by x, then y, then z)
+    nx, ny, nz = (max(round(val) - 1 + extra_res, 0) for val in res)
+    grid = np.indices((nx, ny, nz)).reshape(3, -1).T
+    coords = (grid - h_res) * np.array(vert_dist) + np.array(offset)
+    # connect each vert to its neighbor along each axis
+    idxs = np.arange(nx * ny * nz).reshape(nx, ny, nz)
+    edges = np.concatenate((
+        np.column_stack((idxs[1:].ravel(), idxs[:-1].ravel())),
+        np.column_stack((idxs[:, 1:].ravel(), idxs[:, :-1].ravel())),
+        np.column_stack((idxs[:, :, 1:].ravel(), idxs[:, :, :-1].ravel())),
+    ))
 
-    # create bmesh
+    if len(lattice_cache) >= LATTICE_CACHE_SIZE:
+        lattice_cache.pop(next(iter(lattice_cache)))
+    lattice_cache[key] = (coords.astype(np.float32), edges.astype(np.int32))
+    return lattice_cache[key]
+
+
+def set_lattice_mesh(mesh:Mesh, vert_dist:Vector, scale:Vector, offset:Vector=Vector((0, 0, 0)), extra_res:int=0):
+    """ write lattice into mesh in bulk (does nothing if mesh already holds this lattice) """
+    key = str(get_lattice_key(vert_dist, scale, offset, extra_res))
+    if mesh.get("assemblme_lattice") == key:
+        return
+    coords, edges = get_lattice_arrays(vert_dist, scale, offset, extra_res)
+    mesh.clear_geometry()
+    mesh.vertices.add(len(coords))
+    mesh.edges.add(len(edges))
+    mesh.vertices.foreach_set("co", coords.ravel())
+    mesh.edges.foreach_set("vertices", edges.ravel())
+    mesh.update()
+    mesh["assemblme_lattice"] = key
+
+
+def generate_lattice(vert_dist:Vector, scale:Vector, offset:Vector=Vector((0, 0, 0)), extra_res:int=0, visualize:bool=False):
+    """ return lattice bmesh surrounding object of size 'scale' (see 'get_lattice_arrays' for arguments) """
+    mesh = bpy.data.meshes.new("AssemblMe_lattice_tmp")
+    set_lattice_mesh(mesh, vert_dist, scale, offset, extra_res)
     bme = bmesh.new()
-    vert_matrix = np.zeros((len(coord_matrix), len(coord_matrix[0]), len(coord_matrix[0][0]))).tolist()
-    # add vertex for each coordinate
-    for x in range(len(coord_matrix)):
-        for y in range(len(coord_matrix[0])):
-            for z in range(len(coord_matrix[0][0])):
-                vert_matrix[x][y][z] = bme.verts.new(coord_matrix[x][y][z])
-                # create new edges from vert
-                if x != 0: bme.edges.new((vert_matrix[x][y][z], vert_matrix[x-1][y][z]))
-                if y != 0: bme.edges.new((vert_matrix[x][y][z], vert_matrix[x][y-1][z]))
-                if z != 0: bme.edges.new((vert_matrix[x][y][z], vert_matrix[x][y][z-1]))
+    bme.from_mesh(mesh)
+    bpy.data.meshes.remove(mesh)
 
     if visualize:
         # draw bmesh verts in 3D space
@@ -0,0 +1,431 @@
+# Copyright (C) 2025 Christopher Gearhart
+# chris@bricksbroughttolife.com
+# http://bricksbroughttolife.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# System imports
+import io
+import base64
+import hashlib
+from itertools import chain
+import numpy as np
+
+# Blender imports
+import bpy
+from bpy.types import Object, bpy_prop_collection
+
+# Module imports
+from .common import *
+from .offset_noise import *
+from .profiling import *
+
+# most recent AnimationPlan for each animation, keyed by (scene name, ag.id)
+plan_cache = dict()
+# plan each animation's keyframes were last built from, keyed by (scene name, ag.id)
+built_plan_cache = dict()
+# settings the layering depends on (besides entry names and locations), hashed to key plans stored in the .blend
+PLAN_HASH_PROPS = ("orient", "orient_random", "random_seed", "inverted_build", "layer_height", "skip_empty_selections", "use_instances", "use_loose_parts")
+# bump when the stored plan format changes, so older stored plans are recomputed
+PLAN_FORMAT = 2
+
+
+class AnimationPlan:
+    """ build order of an animated collection, stored as parallel arrays sorted in build order
+
+    Per-object arrays (depths, layer_idxs, start_frames, loc_noise,
+    rot_noise) are aligned with the 'object_names' table. Objects in layer i
+    are the entries in [layer_bounds[i], layer_bounds[i + 1]), so per-layer
+    slices of any array are zero-copy views.
+
+    """
+
+    def __init__(self, object_names:list[str], depths:np.ndarray, inverted_build:bool, layer_bounds:np.ndarray, layer_steps:np.ndarray, objects:list[Object]=None):
+        # object name table (names outlive the objects themselves, e.g. after undo)
+        self.object_names = object_names
+        self._objects = objects
+        # relative z value of each object, and the build direction they were sorted for
+        self.depths = depths
+        self.inverted_build = inverted_build
+        # layer i spans entries [layer_bounds[i], layer_bounds[i + 1]) and starts layer_steps[i] build steps in
+        self.layer_bounds = layer_bounds
+        self.layer_steps = layer_steps
+        self.layer_idxs = np.repeat(np.arange(len(layer_steps)), np.diff(layer_bounds))
+        # random offset noise per object and frame jitter per layer (see 'set_offset_noise')
+        self.loc_noise = None
+        self.rot_noise = None
+        self.loc_jitter = None
+        self.rot_jitter = None
+        # frame each object's layer starts animating (set when animating)
+        self.start_frames = None
+        # frames keyed for each data path, as an (n, 4) array (journal of keyframes to remove on 'Start Over')
+        self.keyed_frames = None
+        # values keyed at those frames for each data path, as an (n, 4, 3) array (so keys the user set at the same frames are kept)
+        self.keyed_values = None
+        # keyframes written for each data path as (frames, values, interpolations) by fast keying, and build time stamp
+        self.schedule = None
+        self.stamp = None
+        # whether objects were animated with drivers instead of keyframes (see 'build_drivers')
+        self.driven = False
+        # name of the instancer (or mesh) whose points (or loose parts) the plan animates; names are then their indices
+        self.instancer = None
+
+    def __len__(self):
+        return len(self.object_names)
+
+    @property
+    def objects(self):
+        """ objects in build order (looked up by name for plans that were loaded) """
+        if self._objects is None:
+            if self.instancer is not None:
+                self._objects = [None] * len(self)
+            else:
+                self._objects = [bpy.data.objects.get(name) for name in self.object_names]
+        return self._objects
+
+    @property
+    def point_idxs(self):
+        """ instancer point (or loose part) index of each entry (for plans with an instancer) """
+        return np.array(self.object_names, dtype=np.int64)
+
+    @property
+    def num_layers(self):
+        """ number of non-empty layers """
+        return len(self.layer_steps)
+
+    @property
+    def num_steps(self):
+        """ number of build steps, including empty layers that were not skipped """
+        return int(self.layer_steps[-1]) + 1 if len(self.layer_steps) > 0 else 0
+
+    def match_objects(self, other):
+        """ returns index arrays (self_idxs, other_idxs) of objects present in both plans """
+        other_idxs = {name: i for i, name in enumerate(other.object_names)}
+        pairs = [(i, other_idxs[name]) for i, name in enumerate(self.object_names) if name in other_idxs]
+        if len(pairs) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        self_idxs, other_idxs = np.array(pairs, dtype=np.int64).T
+        return self_idxs, other_idxs
+
+    def get_jitter(self, data_path:str):
+        """ returns per-layer frame jitter used for keyframes of the given data path """
+        return self.loc_jitter if data_path in ("location", "delta_location") else self.rot_jitter
+
+    def get_layer_keys(self, inverted_build:bool):
+        """ returns ascending layer keys for the given build direction (without re-sorting) """
+        keys = self.depths if inverted_build else -self.depths
+        return keys if inverted_build == self.inverted_build else keys[::-1]
+
+    def layer_slice(self, layer_idx:int):
+        """ returns slice of the entries in the given layer (for zero-copy views of per-object arrays) """
+        layer_idx %= self.num_layers
+        return slice(int(self.layer_bounds[layer_idx]), int(self.layer_bounds[layer_idx + 1]))
+
+    def layer_range(self, layer_idx:int):
+        """ returns [start, end) indices of the objects in the given layer """
+        layer_slice = self.layer_slice(layer_idx)
+        return layer_slice.start, layer_slice.stop
+
+    def layer_objects(self, layer_idx:int):
+        """ returns objects in the given layer """
+        return self.objects[self.layer_slice(layer_idx)]
+
+    def to_bytes(self, include_schedule:bool=True):
+        """ returns compact binary representation of the plan (the keyframe schedule is the largest part, so it can be left out) """
+        arrays = {
+            "object_names": np.array(self.object_names, dtype=str),
+            "depths": self.depths,
+            "inverted_build": np.array(self.inverted_build),
+            "layer_bounds": self.layer_bounds,
+            "layer_steps": self.layer_steps,
+            "driven": np.array(self.driven),
+        }
+        if self.instancer is not None:
+            arrays["instancer"] = np.array(self.instancer, dtype=str)
+        for attr in ("loc_noise", "rot_noise", "loc_jitter", "rot_jitter", "start_frames", "stamp"):
+            if getattr(self, attr) is not None:
+                arrays[attr] = np.asarray(getattr(self, attr))
+        for data_path, frames in (self.keyed_frames or dict()).items():
+            arrays["keyed_frames:%(data_path)s" % locals()] = frames
+        for data_path, values in (self.keyed_values or dict()).items():
+            arrays["keyed_values:%(data_path)s" % locals()] = values
+        for data_path, (frames, values, interpolations) in (self.schedule if include_schedule and self.schedule else dict()).items():
+            arrays["schedule:%(data_path)s:frames" % locals()] = frames
+            arrays["schedule:%(data_path)s:values" % locals()] = values
+            arrays["schedule:%(data_path)s:interpolations" % locals()] = interpolations
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **arrays)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data:bytes):
+        """ returns plan stored with 'to_bytes' """
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            plan = cls(arrays["object_names"].tolist(), arrays["depths"], bool(arrays["inverted_build"]), arrays["layer_bounds"], arrays["layer_steps"])
+            for attr in ("loc_noise", "rot_noise", "loc_jitter", "rot_jitter", "start_frames"):
+                if attr in arrays:
+                    setattr(plan, attr, arrays[attr])
+            if "driven" in arrays:
+                plan.driven = bool(arrays["driven"])
+            if "instancer" in arrays:
+                plan.instancer = str(arrays["instancer"])
+            if "stamp" in arrays:
+                plan.stamp = float(arrays["stamp"])
+            keyed_frames_keys = [key for key in arrays.files if key.startswith("keyed_frames:")]
+            if len(keyed_frames_keys) > 0:
+                plan.keyed_frames = {key.split(":")[1]: arrays[key] for key in keyed_frames_keys}
+            keyed_values_keys = [key for key in arrays.files if key.startswith("keyed_values:")]
+            if len(keyed_values_keys) > 0:
+                plan.keyed_values = {key.split(":")[1]: arrays[key] for key in keyed_values_keys}
+            schedule_keys = [key for key in arrays.files if key.startswith("schedule:")]
+            if len(schedule_keys) > 0:
+                data_paths = sorted(set(key.split(":")[1] for key in schedule_keys))
+                plan.schedule = {data_path: tuple(arrays["schedule:%s:%s" % (data_path, name)] for name in ("frames", "values", "interpolations")) for data_path in data_paths}
+        return plan
+
+
+def get_object_locations(objects:list[Object], use_global:bool):
+    """ returns (n, 3) array of object locations, read in bulk where possible """
+    n = len(objects)
+    if isinstance(objects, bpy_prop_collection):
+        if use_global:
+            # matrices are flattened column-major, so translation is the fourth row
+            mats = np.empty(n * 16, dtype=np.float32)
+            objects.foreach_get("matrix_world", mats)
+            return mats.reshape(n, 4, 4)[:, 3, :3].astype(np.float64)
+        locs = np.empty(n * 3, dtype=np.float32)
+        objects.foreach_get("location", locs)
+        return locs.reshape(n, 3).astype(np.float64)
+    locs = chain.from_iterable(obj.matrix_world.translation if use_global else obj.location for obj in objects)
+    return np.fromiter(locs, dtype=np.float64, count=n * 3).reshape(n, 3)
+
+
+def get_anim_objects_and_locations(ag, mesh_only:bool=None):
+    """ returns animated objects in ag.collection and their locations, read in one bulk call """
+    if mesh_only is None: mesh_only = ag.mesh_only
+    all_objects = ag.collection.all_objects
+    locs = get_object_locations(all_objects, ag.use_global)
+    if not mesh_only:
+        return list(all_objects), locs
+    mask = np.fromiter((obj.type == "MESH" for obj in all_objects), dtype=bool, count=len(all_objects))
+    objects = [obj for obj, keep in zip(all_objects, mask) if keep]
+    return objects, locs[mask]
+
+
+def get_depths(locs:np.ndarray, rot_x:np.ndarray, rot_y:np.ndarray):
+    """ project locations onto the (per-object) layer orientation axis """
+    return locs[:, 2] * np.cos(rot_x) * np.cos(rot_y) + locs[:, 0] * np.sin(rot_y) - locs[:, 1] * np.sin(rot_x)
+
+
+def get_grid_layer_ids(keys:np.ndarray, first_key:float, layer_height:float):
+    """ returns index of the fixed-height layer (measured from 'first_key') containing each key """
+    # keys lying on a layer's upper bound (up to rounding error) belong to that layer
+    layer_ids = np.ceil((keys - first_key) / layer_height - 1e-9) - 1
+    return np.maximum(layer_ids, 0).astype(np.int64)
+
+
+def get_greedy_layer_starts(keys:np.ndarray, layer_height:float):
+    """ returns start indices of layers that each begin at the first key outside the last layer """
+    num_keys = len(keys)
+    # index of the first key past the layer that would start at each key
+    jump = np.append(np.searchsorted(keys, keys + layer_height, side="right"), num_keys)
+    # follow jumps from the first key by pointer doubling (covers 2^i layers per pass)
+    visited = np.zeros(num_keys + 1, dtype=bool)
+    visited[0] = True
+    while not visited[num_keys]:
+        visited[jump[visited]] = True
+        jump = jump[jump]
+    return np.flatnonzero(visited[:-1])
+
+
+def get_layer_bounds(keys:np.ndarray, layer_height:float, skip_empty_selections:bool):
+    """ find layer boundaries in ascending layer keys
+
+    Returns a tuple (layer_bounds, layer_steps) where non-empty layer i spans
+    keys[layer_bounds[i]:layer_bounds[i + 1]] and is animated layer_steps[i]
+    build steps after the first layer. Empty layers only count as build steps
+    when they are not skipped.
+
+    """
+    num_keys = len(keys)
+    if num_keys == 0:
+        return np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    if skip_empty_selections:
+        layer_starts = get_greedy_layer_starts(keys, layer_height)
+        layer_steps = np.arange(len(layer_starts), dtype=np.int64)
+    else:
+        # histogram keys into fixed-height layers, keeping only the occupied ones
+        layer_ids = get_grid_layer_ids(keys, keys[0], layer_height)
+        layer_starts = np.flatnonzero(np.diff(layer_ids, prepend=-1))
+        layer_steps = layer_ids[layer_starts]
+    return np.append(layer_starts, num_keys), layer_steps
+
+
+def get_num_build_steps(keys:np.ndarray, layer_height:float, skip_empty_selections:bool):
+    """ returns number of build steps for ascending layer keys without slicing the layers """
+    if len(keys) == 0:
+        return 0
+    if skip_empty_selections:
+        return len(get_greedy_layer_starts(keys, layer_height))
+    return int(get_grid_layer_ids(keys[-1:], keys[0], layer_height)[0]) + 1
+
+
+def get_animation_plan(ag, objects:list[Object]=None, rot_x:np.ndarray=None, rot_y:np.ndarray=None):
+    """ returns AnimationPlan with objects sorted by z location relative to layer orientation
+
+    Keyword arguments:
+    ag      -- animated collection settings
+    objects -- objects to animate (defaults to animated objects in ag.collection)
+    rot_x   -- per-object x orientation (randomized from ag settings if not specified)
+    rot_y   -- per-object y orientation (randomized from ag settings if not specified)
+
+    """
+    # gather object locations
+    with profile_span("transform_gather") as counts:
+        if objects is None:
+            objects, locs = get_anim_objects_and_locations(ag)
+        else:
+            locs = get_object_locations(objects, ag.use_global)
+        object_names = [obj.name for obj in objects]
+        counts["objects"] = len(objects)
+    return get_plan_for_locations(ag, object_names, locs, objects, rot_x, rot_y)
+
+
+def get_plan_for_locations(ag, object_names:list[str], locs:np.ndarray, objects:list[Object]=None, rot_x:np.ndarray=None, rot_y:np.ndarray=None):
+    """ returns AnimationPlan for entries (objects, or instancer points) with the given names and locations
+
+    Plans for the ag's own orientation are stored in the .blend, and reused
+    as long as the entries, their locations and the layering settings are
+    unchanged (see 'get_plan_hash').
+
+    """
+    if rot_x is None:
+        with profile_span("plan_lookup", objects=len(object_names)) as counts:
+            plan_hash = get_plan_hash(ag, object_names, locs)
+            plan = load_stored_plan(ag, plan_hash)
+            counts["hit"] = plan is not None
+        if plan is not None:
+            if objects is not None:
+                objects_by_name = dict(zip(object_names, objects))
+                plan._objects = [objects_by_name[name] for name in plan.object_names]
+            return plan
+    else:
+        plan_hash = None
+    with profile_span("depth_sort", objects=len(object_names)):
+        # get per-object layer orientation
+        if rot_x is None:
+            orient_noise = get_object_noise(object_names, ag.random_seed, ORIENT_NOISE, size=2) * ag.orient_random
+            rot_x = ag.orient[0] + orient_noise[:, 0]
+            rot_y = ag.orient[1] + orient_noise[:, 1]
+        depths = get_depths(locs, rot_x, rot_y)
+        # sort by relative z values (stable, so ties keep collection order)
+        keys = depths if ag.inverted_build else -depths
+        order = np.argsort(keys, kind="stable")
+    # slice sorted keys into layers
+    with profile_span("layer_slicing") as counts:
+        layer_bounds, layer_steps = get_layer_bounds(keys[order], ag.layer_height, ag.skip_empty_selections)
+        counts["layers"] = len(layer_steps)
+    plan = AnimationPlan([object_names[i] for i in order], depths[order], ag.inverted_build, layer_bounds, layer_steps, objects=None if objects is None else [objects[i] for i in order])
+    with profile_span("offset_generation", objects=len(plan), layers=plan.num_layers):
+        set_offset_noise(plan, ag.random_seed)
+    if plan_hash is not None:
+        with profile_span("plan_store"):
+            store_plan(ag, plan_hash, plan)
+    return plan
+
+
+def set_offset_noise(plan:AnimationPlan, seed:int):
+    """ generate per-object offset noise and per-layer frame jitter for plan (deterministic for a given seed) """
+    plan.loc_noise = get_object_noise(plan.object_names, seed, LOC_NOISE)
+    plan.rot_noise = get_object_noise(plan.object_names, seed, ROT_NOISE)
+    plan.loc_jitter = get_index_noise(plan.num_layers, seed, LOC_JITTER, -0.5, 0.5)
+    plan.rot_jitter = get_index_noise(plan.num_layers, seed, ROT_JITTER, -0.5, 0.5)
+
+
+def get_plan_key(ag):
+    return (ag.id_data.name, ag.id)
+
+
+def cache_plan(ag, plan:AnimationPlan):
+    """ store most recent plan for this animation (for the rest of the session) """
+    plan_cache[get_plan_key(ag)] = plan
+
+
+def get_cached_plan(ag):
+    return plan_cache.get(get_plan_key(ag))
+
+
+def clear_cached_plan(ag):
+    plan_cache.pop(get_plan_key(ag), None)
+
+
+def cache_built_plan(ag, plan:AnimationPlan):
+    """ store plan the animation's keyframes were built from, stamped to detect undo/redo
+
+    The plan is also saved with the .blend (without its keyframe schedule),
+    so keyframes can still be retimed or removed after reopening the file.
+
+    """
+    plan.stamp = ag.plan_stamp
+    built_plan_cache[get_plan_key(ag)] = plan
+    with profile_span("plan_store"):
+        ag.built_plan_data = encode_plan(plan, include_schedule=False)
+
+
+def get_built_plan(ag):
+    """ returns plan the animation's current keyframes were built from (or None if unknown/outdated) """
+    plan = built_plan_cache.get(get_plan_key(ag))
+    if (plan is None or plan.stamp != ag.plan_stamp) and ag.built_plan_data != "":
+        # e.g. the file was reopened since the animation was built
+        plan = decode_plan(ag.built_plan_data)
+        built_plan_cache[get_plan_key(ag)] = plan
+    if plan is None or plan.stamp != ag.plan_stamp or plan.keyed_frames is None:
+        return None
+    return plan
+
+
+def clear_built_plan(ag):
+    built_plan_cache.pop(get_plan_key(ag), None)
+    ag.built_plan_data = ""
+
+
+def get_plan_hash(ag, object_names:list[str], locs:np.ndarray):
+    """ returns hash of everything the layering of a plan depends on: entry names, their locations and ag's layering settings """
+    settings = tuple(tuple(value) if hasattr(value, "__len__") else value for value in (getattr(ag, prop) for prop in PLAN_HASH_PROPS))
+    plan_hash = hashlib.blake2b(repr((PLAN_FORMAT, settings)).encode(), digest_size=16)
+    plan_hash.update("\0".join(object_names).encode())
+    plan_hash.update(np.ascontiguousarray(locs, dtype=np.float64).tobytes())
+    return plan_hash.hexdigest()
+
+
+def store_plan(ag, plan_hash:str, plan:AnimationPlan):
+    """ save plan with the .blend, keyed by plan_hash """
+    ag.plan_hash = plan_hash
+    ag.plan_data = encode_plan(plan)
+
+
+def load_stored_plan(ag, plan_hash:str):
+    """ returns plan saved with the .blend (or None if it was computed from different inputs) """
+    if ag.plan_hash != plan_hash or ag.plan_data == "":
+        return None
+    return decode_plan(ag.plan_data)
+
+
+def encode_plan(plan:AnimationPlan, include_schedule:bool=True):
+    # string properties can't hold arbitrary bytes
+    return base64.b64encode(plan.to_bytes(include_schedule)).decode("ascii")
+
+
+def decode_plan(data:str):
+    return AnimationPlan.from_bytes(base64.b64decode(data))
@@ -0,0 +1,180 @@
+# Copyright (C) 2025 Christopher Gearhart
+# chris@bricksbroughttolife.com
+# http://bricksbroughttolife.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# System imports
+import hashlib
+import numpy as np
+
+# Blender imports
+import bpy
+from bpy.types import Object
+
+# Module imports
+from .instance_build import *
+
+LOOSE_PARTS_NODE_GROUP_NAME = "AssemblMe Build Loose Parts"
+# per-vertex attributes written by the build (read by the node group)
+LOOSE_PART_ATTRIBUTES = BUILD_ATTRIBUTES + ("part_center",)
+# loose part index of each vertex, by mesh name: (num vertices, hash of the edge array, part indices)
+loose_part_cache = dict()
+
+
+def get_loose_part_idxs(num_verts:int, edges:np.ndarray):
+    """ returns loose part index of each vertex, connecting vertices by the (m, 2) array of edge vertex indices
+
+    Union-find vectorized over all edges at once: each pass hooks the larger
+    root of every edge that spans two trees onto the smaller one, then
+    flattens the trees by pointer jumping until every vertex points at its root.
+
+    """
+    parents = np.arange(num_verts)
+    while len(edges) > 0:
+        roots = parents[edges]
+        lo, hi = roots.min(axis=1), roots.max(axis=1)
+        spanning = lo != hi
+        if not spanning.any():
+            break
+        # parents only ever point at smaller indices, so no cycles are formed
+        np.minimum.at(parents, hi[spanning], lo[spanning])
+        while True:
+            grandparents = parents[parents]
+            if np.array_equal(grandparents, parents):
+                break
+            parents = grandparents
+        # only edges still spanning two trees need another pass
+        edges = edges[spanning]
+    return np.unique(parents, return_inverse=True)[1].reshape(-1)
+
+
+def get_parts_object(ag):
+    """ returns object whose loose parts ag animates (ag.parts_object, or the first mesh in ag.collection) """
+    if ag.parts_object is not None:
+        return ag.parts_object
+    return next((obj for obj in ag.collection.all_objects if obj.type == "MESH"), None)
+
+
+def get_mesh_loose_parts(mesh):
+    """ returns loose part index of each vertex of mesh (cached until its vertices or edges change) """
+    num_verts = len(mesh.vertices)
+    edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edges)
+    # reading and hashing the edges is far cheaper than finding the parts again
+    edges_hash = hashlib.blake2b(edges.tobytes(), digest_size=16).digest()
+    cached = loose_part_cache.get(mesh.name)
+    if cached is not None and cached[:2] == (num_verts, edges_hash):
+        return cached[2]
+    part_idxs = get_loose_part_idxs(num_verts, edges.reshape(-1, 2).astype(np.int64))
+    loose_part_cache[mesh.name] = (num_verts, edges_hash, part_idxs)
+    return part_idxs
+
+
+def get_loose_part_centers(mesh, part_idxs:np.ndarray):
+    """ returns (num parts, 3) array of the mean vertex location of each loose part """
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    co = co.reshape(-1, 3).astype(np.float64)
+    counts = np.bincount(part_idxs)
+    return np.column_stack([np.bincount(part_idxs, weights=co[:, axis]) for axis in range(3)]) / counts[:, None]
+
+
+def get_loose_part_locations(ag):
+    """ returns (num parts, 3) array of the centers of the loose parts ag animates """
+    obj = get_parts_object(ag)
+    centers = get_loose_part_centers(obj.data, get_mesh_loose_parts(obj.data))
+    if ag.use_global:
+        mat = np.array(obj.matrix_world)
+        centers = centers @ mat[:3, :3].T + mat[:3, 3]
+    return centers
+
+
+def get_loose_parts_node_group(loc_interpolation_mode:str, rot_interpolation_mode:str, build_type:str):
+    """ returns node group moving vertices by their loose part's build attributes (shared by builds with the same settings) """
+    name = get_node_group_name(LOOSE_PARTS_NODE_GROUP_NAME, loc_interpolation_mode, rot_interpolation_mode, build_type)
+    node_group = bpy.data.node_groups.get(name)
+    if node_group is not None:
+        return node_group
+    node_group = new_build_node_group(name)
+    links = node_group.links
+    # rotate each part about its center, then move it by the remaining part of its offset
+    rotate = new_node(node_group, "ShaderNodeVectorRotate", 6, 0)
+    rotate.rotation_type = "EULER_XYZ"
+    links.new(new_node(node_group, "GeometryNodeInputPosition", 5, -1).outputs["Position"], rotate.inputs["Vector"])
+    links.new(new_named_attribute(node_group, "part_center", "FLOAT_VECTOR", 5, 0), rotate.inputs["Center"])
+    links.new(new_build_offset(node_group, "rot_build_frame", "rot_offset", rot_interpolation_mode, build_type, 3), rotate.inputs["Rotation"])
+    position = new_node(node_group, "ShaderNodeVectorMath", 7, 0)
+    position.operation = "ADD"
+    links.new(rotate.outputs["Vector"], position.inputs[0])
+    links.new(new_build_offset(node_group, "build_frame", "loc_offset", loc_interpolation_mode, build_type, 4), position.inputs[1])
+    set_position = new_node(node_group, "GeometryNodeSetPosition", 8, 0)
+    links.new(node_group.nodes["Group Input"].outputs["Geometry"], set_position.inputs["Geometry"])
+    links.new(position.outputs["Vector"], set_position.inputs["Position"])
+    links.new(set_position.outputs["Geometry"], node_group.nodes["Group Output"].inputs["Geometry"])
+    return node_group
+
+
+def set_loose_part_build(ag, obj:Object, part_order:np.ndarray, timing:np.ndarray, loc_offsets:np.ndarray, rot_offsets:np.ndarray):
+    """ write build attributes for the vertices of obj's loose parts and (re)configure its build modifier
+
+    Keyword arguments:
+    ag          -- animated collection settings
+    obj         -- mesh object with the loose parts to animate
+    part_order  -- loose part index of each row of the other arrays
+    timing      -- (n, 3) array of [location start frame, rotation start frame, duration] (see 'get_build_timing')
+    loc_offsets -- (n, 3) array of location offsets
+    rot_offsets -- (n, 3) array of rotation offsets
+
+    """
+    mesh = obj.data
+    part_idxs = get_mesh_loose_parts(mesh)
+    num_parts = part_idxs.max() + 1 if len(part_idxs) > 0 else 0
+    set_point_attribute(mesh, "part_center", "FLOAT_VECTOR", get_loose_part_centers(mesh, part_idxs)[part_idxs])
+    if ag.use_global:
+        loc_offsets = get_local_offsets(obj, loc_offsets)
+    for name, values in (("loc_offset", loc_offsets), ("rot_offset", rot_offsets)):
+        part_values = np.zeros((num_parts, 3))
+        part_values[part_order] = values
+        set_point_attribute(mesh, name, "FLOAT_VECTOR", part_values[part_idxs])
+    modifier = obj.modifiers.get(BUILD_MODIFIER) or obj.modifiers.new(BUILD_MODIFIER, "NODES")
+    modifier.node_group = get_loose_parts_node_group(ag.loc_interpolation_mode, ag.rot_interpolation_mode, ag.build_type)
+    set_loose_part_timing(obj, part_order, timing)
+
+
+def set_loose_part_timing(obj:Object, part_order:np.ndarray, timing:np.ndarray):
+    """ update build timing of obj's loose parts (retimes their animation without touching the offsets) """
+    mesh = obj.data
+    part_idxs = get_mesh_loose_parts(mesh)
+    num_parts = part_idxs.max() + 1 if len(part_idxs) > 0 else 0
+    for name, column in (("build_frame", 0), ("rot_build_frame", 1)):
+        part_values = np.zeros(num_parts)
+        part_values[part_order] = timing[:, column]
+        set_point_attribute(mesh, name, "FLOAT", part_values[part_idxs])
+    if len(timing) > 0:
+        set_modifier_input(obj.modifiers[BUILD_MODIFIER], "Duration", float(timing[0, 2]))
+    mesh.update()
+    obj.update_tag()
+
+
+def remove_loose_part_build(obj:Object):
+    """ remove the build modifier and attributes from obj """
+    modifier = obj.modifiers.get(BUILD_MODIFIER)
+    if modifier is None:
+        return
+    obj.modifiers.remove(modifier)
+    for name in LOOSE_PART_ATTRIBUTES:
+        attr = obj.data.attributes.get(name)
+        if attr is not None:
+            obj.data.attributes.remove(attr)
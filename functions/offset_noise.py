@@ -0,0 +1,75 @@
+# Copyright (C) 2025 Christopher Gearhart
+# chris@bricksbroughttolife.com
+# http://bricksbroughttolife.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# System imports
+import hashlib
+import numpy as np
+
+# Blender imports
+# NONE!
+
+# Module imports
+# NONE!
+
+# noise streams (keep values stable, as they determine the generated animations)
+ORIENT_NOISE = 1
+LOC_NOISE = 2
+ROT_NOISE = 3
+LOC_JITTER = 4
+ROT_JITTER = 5
+
+
+def splitmix64(x:np.ndarray):
+    """ vectorized splitmix64 hash of uint64 array """
+    with np.errstate(over="ignore"):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def get_name_keys(names:list[str]):
+    """ returns uint64 hash key for each name (64 bits, so keys of large collections practically never collide) """
+    digests = b"".join(hashlib.blake2b(name.encode(), digest_size=8).digest() for name in names)
+    return np.frombuffer(digests, dtype="<u8", count=len(names)).astype(np.uint64)
+
+
+def get_uniform_noise(keys:np.ndarray, seed:int, stream:int, size:int, low:float=-1, high:float=1):
+    """ returns (len(keys), size) array of uniform noise in [low, high) determined only by each key, seed and stream
+
+    Keyword arguments:
+    keys   -- uint64 key for each row (e.g. from 'get_name_keys')
+    seed   -- user seed
+    stream -- noise stream (independent noise for each purpose)
+    size   -- number of values per key
+
+    """
+    seed_key = splitmix64(np.array([seed * 0x10001 + stream], dtype=np.uint64))
+    with np.errstate(over="ignore"):
+        counters = splitmix64(keys ^ seed_key)[:, None] + np.arange(size, dtype=np.uint64)[None, :] * np.uint64(0x9E3779B97F4A7C15)
+    unit = (splitmix64(counters) >> np.uint64(11)) * (1.0 / (1 << 53))
+    return low + (high - low) * unit
+
+
+def get_object_noise(object_names:list[str], seed:int, stream:int, size:int=3, low:float=-1, high:float=1):
+    """ returns uniform noise per object, stable across rebuilds, reordering and membership changes """
+    return get_uniform_noise(get_name_keys(object_names), seed, stream, size, low, high)
+
+
+def get_index_noise(count:int, seed:int, stream:int, low:float=-1, high:float=1):
+    """ returns uniform noise for indices 0..count-1 (e.g. per-layer values) """
+    return get_uniform_noise(np.arange(count, dtype=np.uint64), seed, stream, 1, low, high)[:, 0]
@@ -0,0 +1,245 @@
+# Copyright (C) 2025 Christopher Gearhart
+# chris@bricksbroughttolife.com
+# http://bricksbroughttolife.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# System imports
+import os
+import ast
+import json
+import time
+from os.path import join, isfile, splitext
+
+# Blender imports
+import bpy
+from bpy.types import Context
+
+# Module imports
+from .general import *
+
+# seconds between checks of the presets folder for added/removed presets
+PRESET_CHECK_INTERVAL = 1.0
+# animation settings stored in presets
+PRESET_PROPS = (
+    "build_speed",
+    "velocity",
+    "loc_offset",
+    "loc_interpolation_mode",
+    "loc_random",
+    "rot_offset",
+    "rot_interpolation_mode",
+    "rot_random",
+    "orient",
+    "orient_random",
+    "layer_height",
+    "build_type",
+    "inverted_build",
+    "skip_empty_selections",
+    "use_global",
+    "mesh_only",
+)
+PRESET_VERSION = 1
+
+# enum items for the presets folder (Blender requires callers to keep a reference to these strings)
+preset_items_cache = {"items": None, "mtime": None, "last_check": 0.0}
+# whether the default presets have been copied to the presets folder this session
+default_presets_synced = False
+# validated preset settings by filepath: {filepath: (mtime, settings)}
+preset_settings_cache = dict()
+
+
+def sync_default_presets(force:bool=False):
+    """ create presets folder and copy default presets to it (once per session) """
+    global default_presets_synced
+    if default_presets_synced and not force:
+        return
+    path = get_presets_filepath()
+    if not os.path.exists(path):
+        os.makedirs(path)
+    if force or not bpy.app.background:
+        transfer_defaults_to_preset_folder(path)
+    import_legacy_presets(path)
+    default_presets_synced = True
+    invalidate_preset_items()
+
+
+def get_presets_mtime(path:str):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def get_preset_items():
+    """ returns (cached) enum items for the presets in the presets folder """
+    sync_default_presets()
+    cache = preset_items_cache
+    # only stat the presets folder once per interval (it may be on a slow network drive)
+    now = time.monotonic()
+    if cache["items"] is not None and now - cache["last_check"] < PRESET_CHECK_INTERVAL:
+        return cache["items"]
+    cache["last_check"] = now
+    path = get_presets_filepath()
+    mtime = get_presets_mtime(path)
+    if cache["items"] is not None and mtime == cache["mtime"]:
+        return cache["items"]
+    # refresh preset names
+    filenames = get_preset_filenames(path) if mtime is not None else []
+    names = sorted(set(splitext(fn)[0] for fn in filenames if fn.endswith((".json", ".py"))))
+    preset_names = [("None", "None", "Don't use a preset")]
+    preset_names += [(name, name.replace("_", " ").capitalize(), "Select this preset!") for name in names]
+    cache["items"] = preset_names
+    cache["mtime"] = mtime
+    return preset_names
+
+
+def get_preset_tuples(self, context:Context):
+    return get_preset_items()
+
+
+def invalidate_preset_items():
+    """ force preset enum items to be re-read (call after creating or removing a preset) """
+    preset_items_cache["items"] = None
+
+
+def get_preset_schema():
+    """ returns RNA properties of the animation settings (AnimatedCollectionProperties) """
+    return bpy.types.Scene.bl_rna.properties["aglist"].fixed_type.properties
+
+
+def validate_preset_value(prop, key:str, value):
+    """ returns value converted to the type of RNA property 'prop' (raises ValueError if it doesn't fit) """
+    if prop.type == "ENUM":
+        enum_keys = prop.enum_items.keys()
+        # older presets may store enum values in lower case
+        if isinstance(value, str) and value not in enum_keys and value.upper() in enum_keys:
+            value = value.upper()
+        if value not in enum_keys:
+            raise ValueError("'%(key)s' must be one of %(enum_keys)s, not %(value)r" % locals())
+        return value
+    if prop.type == "BOOLEAN":
+        if value not in (True, False):
+            raise ValueError("'%(key)s' must be true or false, not %(value)r" % locals())
+        return bool(value)
+    if prop.type not in ("INT", "FLOAT"):
+        raise ValueError("'%(key)s' can't be stored in presets" % locals())
+    num_type = int if prop.type == "INT" else float
+    values = value if prop.is_array else [value]
+    if prop.is_array and (not isinstance(value, (list, tuple)) or len(value) != prop.array_length):
+        raise ValueError("'%s' must be a list of %d numbers, not %r" % (key, prop.array_length, value))
+    for val in values:
+        if isinstance(val, bool) or not isinstance(val, (int, float)) or (num_type is int and val != int(val)):
+            raise ValueError("'%s' must be %s, not %r" % (key, "an integer" if num_type is int else "a number", val))
+        if not prop.hard_min <= val <= prop.hard_max:
+            raise ValueError("'%s' must be between %s and %s, not %r" % (key, prop.hard_min, prop.hard_max, val))
+    values = [num_type(val) for val in values]
+    return tuple(values) if prop.is_array else values[0]
+
+
+def validate_preset_settings(settings:dict):
+    """ returns preset settings converted to the animation settings' types (raises ValueError if invalid) """
+    if not isinstance(settings, dict):
+        raise ValueError("preset settings must be an object")
+    schema = get_preset_schema()
+    validated = dict()
+    for key, value in settings.items():
+        if key not in PRESET_PROPS:
+            raise ValueError("unknown setting '%(key)s'" % locals())
+        validated[key] = validate_preset_value(schema[key], key, value)
+    return validated
+
+
+def read_preset_file(filepath:str):
+    """ returns validated settings stored in a JSON preset file """
+    with open(filepath, "r") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(str(e))
+    if not isinstance(data, dict) or "settings" not in data:
+        raise ValueError("preset file has no 'settings'")
+    return validate_preset_settings(data["settings"])
+
+
+def write_preset_file(filepath:str, settings:dict):
+    with open(filepath, "w") as f:
+        json.dump({"version": PRESET_VERSION, "settings": settings}, f, indent=4)
+
+
+def read_legacy_preset(filepath:str):
+    """ returns settings assigned to 'ag.<setting>' in a legacy Python preset (read without executing it) """
+    with open(filepath, "r") as f:
+        tree = ast.parse(f.read(), filepath)
+    settings = dict()
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Assign) or len(node.targets) != 1:
+            continue
+        target = node.targets[0]
+        if isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name) and target.value.id == "ag" and target.attr in PRESET_PROPS:
+            settings[target.attr] = ast.literal_eval(node.value)
+    return validate_preset_settings(settings)
+
+
+def import_legacy_presets(path:str):
+    """ convert Python presets in the presets folder to JSON (originals are moved to the 'legacy' folder) """
+    legacy_path = join(path, "legacy")
+    for filename in get_preset_filenames(path):
+        name, ext = splitext(filename)
+        if ext != ".py":
+            continue
+        filepath = join(path, filename)
+        if not isfile(join(path, name + ".json")):
+            try:
+                write_preset_file(join(path, name + ".json"), read_legacy_preset(filepath))
+            except (SyntaxError, ValueError) as e:
+                print("Could not import AssemblMe preset '%(filename)s': %(e)s" % locals())
+                continue
+        if not os.path.exists(legacy_path):
+            os.mkdir(legacy_path)
+        os.replace(filepath, join(legacy_path, filename))
+
+
+def get_preset_settings(name:str):
+    """ returns validated settings of preset 'name' (parsed once, and again only if the file changes) """
+    path = get_presets_filepath()
+    filepath = join(path, name + ".json")
+    if not isfile(filepath) and isfile(join(path, name + ".py")):
+        import_legacy_presets(path)
+    mtime = os.stat(filepath).st_mtime_ns
+    cached = preset_settings_cache.get(filepath)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    settings = read_preset_file(filepath)
+    preset_settings_cache[filepath] = (mtime, settings)
+    return settings
+
+
+def apply_preset(ag, name:str):
+    """ set animation settings of ag from preset 'name' """
+    for key, value in get_preset_settings(name).items():
+        setattr(ag, key, value)
+
+
+def get_preset_settings_from_ag(ag):
+    """ returns preset settings for the current animation settings of ag """
+    schema = get_preset_schema()
+    settings = dict()
+    for key in PRESET_PROPS:
+        value = getattr(ag, key)
+        if schema[key].type == "FLOAT":
+            value = [round(val, 6) for val in value] if schema[key].is_array else round(value, 6)
+        elif schema[key].is_array:
+            value = list(value)
+        settings[key] = value
+    return settings
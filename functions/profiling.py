@@ -0,0 +1,118 @@
+# Copyright (C) 2025 Christopher Gearhart
+# chris@bricksbroughttolife.com
+# http://bricksbroughttolife.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# System imports
+import json
+import time
+import functools
+from collections import deque
+from contextlib import contextmanager
+
+# Blender imports
+# NONE!
+
+# Module imports
+# NONE!
+
+
+# most recent profiled runs (oldest are dropped first)
+profile_history = deque(maxlen=32)
+# stack of runs/spans currently being timed
+_open_spans = []
+# start time of each open run, by id (kept out of the run so it isn't exported)
+_run_start_times = dict()
+
+
+@contextmanager
+def profile_span(name:str, **counts):
+    """ time the enclosed block as a named span of the active profiled run
+
+    Yields the span's counts dict, so counts only known inside the block
+    (e.g. keyframes written) can be filled in. Does nothing outside of a
+    profiled run.
+
+    """
+    if len(_open_spans) == 0:
+        yield dict(counts)
+        return
+    span = {"name": name, "depth": len(_open_spans) - 1, "counts": counts}
+    # spans are listed in the order they start, nested spans after their parent
+    _open_spans[0]["spans"].append(span)
+    _open_spans.append(span)
+    start_time = time.perf_counter()
+    try:
+        yield counts
+    finally:
+        span["time"] = time.perf_counter() - start_time
+        _open_spans.pop()
+
+
+def profiled_run(name:str):
+    """ decorator recording each call as a run in profile_history (nested calls are recorded as spans) """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if len(_open_spans) > 0:
+                with profile_span(name):
+                    return func(*args, **kwargs)
+            run = begin_profile_run(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                end_profile_run(run)
+        return wrapper
+    return decorator
+
+
+def begin_profile_run(name:str):
+    """ start recording a run explicitly (for runs spanning several calls, e.g. modal operators); finish it with 'end_profile_run' """
+    run = {"name": name, "date": time.time(), "spans": []}
+    _open_spans.append(run)
+    _run_start_times[id(run)] = time.perf_counter()
+    return run
+
+
+def end_profile_run(run:dict):
+    """ finish run and record it in profile_history (does nothing if it was already finished) """
+    start_time = _run_start_times.pop(id(run), None)
+    if start_time is None:
+        return
+    run["time"] = time.perf_counter() - start_time
+    _open_spans.clear()
+    profile_history.append(run)
+    print_profile_run(run)
+
+
+def get_last_profile_run():
+    return profile_history[-1] if len(profile_history) > 0 else None
+
+
+def format_counts(counts:dict):
+    return ", ".join("%s: %s" % (key, value) for key, value in counts.items())
+
+
+def print_profile_run(run:dict):
+    print("%(name)s – Time Elapsed: %(time).4fs" % run)
+    for span in run["spans"]:
+        counts = " (%s)" % format_counts(span["counts"]) if span["counts"] else ""
+        print("  " * (span["depth"] + 1) + "%s: %.4fs%s" % (span["name"], span["time"], counts))
+
+
+def dump_profile_history(filepath:str):
+    """ write all runs in profile_history to a JSON file """
+    with open(filepath, "w") as f:
+        json.dump(list(profile_history), f, indent=2)
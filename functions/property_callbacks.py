@@ -20,11 +20,13 @@ from operator import itemgetter
 
 # Blender imports
 import bpy
-from bpy.types import Context
+from bpy.types import Context, Object
 from bpy.props import *
 
 # Module imports
 from .general import *
+from .preset_registry import *
+from .visualizer_updates import *
 
 
 def uniquify_name(self, context:Context):
@@ -46,6 +48,8 @@ def uniquify_name(self, context:Context):
 
 def collection_update(self, context:Context):
     scn, ag0 = get_active_context_info()
+    clear_cached_plan(self)
+    clear_animation_indices(scn)
     # get rid of unused groups created by AssemblMe
     collections = bpy.data.collections
     for c in collections:
@@ -62,6 +66,8 @@ def collection_update(self, context:Context):
 def set_meshes_only(self, context:Context):
     scn, ag = get_active_context_info()
     clear_preset(self, context)
+    clear_cached_plan(self)
+    clear_animation_indices(scn)
     objs_to_clear = []
     if ag.collection is not None and ag.mesh_only:
         objs_to_clear = [obj for obj in get_anim_objects(ag, mesh_only=False) if obj.type != "MESH"]
@@ -81,6 +87,48 @@ def clear_preset(self, context:Context):
     pass
 
 
+def update_anim_length(self, context:Context):
+    """ update duration readout from the last computed plan (no need to refresh for timing/layer changes)
+
+    Built animations keep the length of their keyframes until they're
+    rebuilt or retimed.
+
+    """
+    clear_preset(self, context)
+    plan = get_cached_plan(self)
+    if plan is not None and not self.animated:
+        self.anim_length = get_anim_length(self, plan)
+
+
+def clear_layer_plan(self, context:Context):
+    """ layer depths depend on this setting, so the last computed plan is no longer valid """
+    clear_preset(self, context)
+    clear_cached_plan(self)
+
+
+def instancer_poll(self, obj:Object):
+    return obj.type == "MESH"
+
+
+def update_orient(self, context:Context):
+    clear_layer_plan(self, context)
+    update_visualizer(context.scene, orientation=True)
+
+
+def update_visualizer_bounds(self, context:Context):
+    """ first or last layer location changed, so the visualizer animation is outdated """
+    update_visualizer(context.scene, animation=True)
+
+
+def handle_visualizer_needs_update(self, context:Context):
+    if self.visualizer_needs_update:
+        update_visualizer(context.scene, animation=True)
+
+
+def update_visualizer_lattice(self, context:Context):
+    update_visualizer(context.scene, lattice=True)
+
+
 def handle_outdated_preset(self, context:Context):
     scn, ag = get_active_context_info()
     clear_preset(self, context)
@@ -89,21 +137,20 @@ def handle_outdated_preset(self, context:Context):
 
 
 def update_anim_preset(self, context:Context):
-    scn, ag = get_active_context_info()
+    ag = self
     if ag.anim_preset != "None":
-        import importlib.util
-        path_to_file = os.path.join(get_presets_filepath(), ag.anim_preset + ".py")
-        if os.path.isfile(path_to_file):
-            spec = importlib.util.spec_from_file_location(ag.anim_preset + ".py", path_to_file)
-            foo = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(foo)
-            foo.execute()
-        else:
-            bad_preset = str(ag.anim_preset)
+        bad_preset = str(ag.anim_preset)
+        try:
+            apply_preset(ag, bad_preset)
+            error_string = None
+        except FileNotFoundError:
             if bad_preset in get_default_preset_names():
-                error_string = "Preset '%(bad_preset)s' could not be found. This is a default preset – try reinstalling the addon to restore it." % locals()
+                error_string = "Preset '%(bad_preset)s' could not be found. This is a default preset – try reinstalling the addon to restore it." % locals()
             else:
                 error_string = "Preset '%(bad_preset)s' could not be found." % locals()
+        except ValueError as e:
+            error_string = "Preset '%(bad_preset)s' is invalid: %(e)s" % locals()
+        if error_string is not None:
             sys.stderr.write(error_string)
             print(error_string)
             ag.anim_preset = "None"
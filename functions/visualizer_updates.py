@@ -0,0 +1,104 @@
+# Copyright (C) 2025 Christopher Gearhart
+# chris@bricksbroughttolife.com
+# http://bricksbroughttolife.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# System imports
+from math import cos, sin
+
+# Blender imports
+import bpy
+from bpy.types import Object, Scene
+from mathutils import Vector
+
+# Module imports
+from .common import *
+from .general import *
+from .lattice_mesh_generate import *
+
+VISUALIZER_NAME = "AssemblMe_visualizer"
+
+
+def get_visualizer_obj(create:bool=False):
+    """ returns the layer orientation visualizer object (created if it doesn't exist and 'create' is set) """
+    v_obj = bpy.data.objects.get(VISUALIZER_NAME)
+    if v_obj is None and create:
+        m = bpy.data.meshes.new(VISUALIZER_NAME + "_m")
+        v_obj = bpy.data.objects.new(VISUALIZER_NAME, m)
+    return v_obj
+
+
+def visualizer_enabled(scn:Scene):
+    """ returns boolean for visualizer enabled for the active animation """
+    if scn.aglist_index == -1:
+        return False
+    return scn.aglist[scn.aglist_index].visualizer_active
+
+
+def set_visualizer_lattice(v_obj:Object, scn:Scene):
+    """ load lattice mesh for the current visualizer settings (reused if unchanged) """
+    set_lattice_mesh(v_obj.data, Vector((scn.assemblme.visualizer_res, scn.assemblme.visualizer_res, 1)), Vector([scn.assemblme.visualizer_scale]*2 + [1]), offset=Vector((0, 0, 1)))
+
+
+def set_visualizer_orientation(v_obj:Object, ag):
+    """ rotate visualizer to the layer orientation of ag """
+    v_obj.rotation_euler.x = ag.orient[0]
+    v_obj.rotation_euler.y = ag.orient[1]
+    v_obj.rotation_euler.z = ag.orient[0] * (cos(ag.orient[1]) * sin(ag.orient[1]))
+
+
+def set_visualizer_animation(v_obj:Object, ag):
+    """ animate visualizer from the first to the last layer of ag (or keep it stationary) """
+    ag.visualizer_needs_update = False
+    # if first and last location are the same, keep visualizer stationary
+    if ag.obj_min_loc == ag.obj_max_loc or ag.orient_random > 0.0025:
+        clear_animation(v_obj)
+        v_obj.location = ag.obj_min_loc
+        ag.visualizer_animated = False
+        return "static"
+    # else, create animation
+    else:
+        # if animation already created, clear it
+        if ag.visualizer_animated:
+            clear_animation(v_obj)
+        # set up vars
+        v_obj.location = ag.obj_min_loc
+        start_frame = ag.frame_with_orig_loc
+        # insert keyframe and iterate current frame, and set another
+        insert_keyframes(v_obj, "location", start_frame)
+        v_obj.location = ag.obj_max_loc
+        mult = 1 if ag.build_type == "ASSEMBLE" else -1
+        end_frame = start_frame - (ag.anim_length - ag.last_layer_velocity) * mult
+        insert_keyframes(v_obj, "location", end_frame, if_needed=True)
+        ag.visualizer_animated = True
+        set_interpolation(v_obj, "loc", "LINEAR")
+
+        return "animated"
+
+
+def update_visualizer(scn:Scene, lattice:bool=False, orientation:bool=False, animation:bool=False):
+    """ update the given parts of the visualizer if it is enabled for the active animation """
+    if not visualizer_enabled(scn):
+        return
+    v_obj = get_visualizer_obj()
+    if v_obj is None:
+        return
+    ag = scn.aglist[scn.aglist_index]
+    if lattice:
+        set_visualizer_lattice(v_obj, scn)
+    if orientation:
+        set_visualizer_orientation(v_obj, ag)
+    if animation:
+        set_visualizer_animation(v_obj, ag)
+    tag_redraw_areas("VIEW_3D")
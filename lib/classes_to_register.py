@@ -17,10 +17,12 @@ from ..operators import *
 classes = [
     # assemblme/operators
     create_build_animation.ASSEMBLME_OT_create_build_animation,
+    export_profile.ASSEMBLME_OT_export_profile,
     info_restore_preset.ASSEMBLME_OT_info_restore_preset,
     new_group_from_selection.ASSEMBLME_OT_new_group_from_selection,
     presets.ASSEMBLME_OT_anim_presets,
     refresh_build_animation_length.ASSEMBLME_OT_refresh_anim_length,
+    retime_build_animation.ASSEMBLME_OT_retime_build_animation,
     start_over.ASSEMBLME_OT_start_over,
     visualizer.ASSEMBLME_OT_visualizer,
     aglist_actions.AGLIST_OT_list_action,
@@ -35,6 +37,7 @@ classes = [
     ASSEMBLME_PT_animations,
     ASSEMBLME_PT_actions,
     ASSEMBLME_PT_settings,
+    ASSEMBLME_PT_performance,
     ASSEMBLME_PT_visualizer_settings,
     ASSEMBLME_PT_preset_manager,
     ASSEMBLME_UL_items,
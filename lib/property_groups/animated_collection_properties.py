@@ -58,7 +58,7 @@ class AnimatedCollectionProperties(PropertyGroup):
         description="Number of frames to skip forward between each object selection",
         min=1,
         soft_max=1000,
-        update=clear_preset,
+        update=update_anim_length,
         default=1,
     )
     velocity: FloatProperty(
@@ -68,7 +68,7 @@ class AnimatedCollectionProperties(PropertyGroup):
         min=0.001,
         soft_max=100,
         step=1,
-        update=clear_preset,
+        update=update_anim_length,
         default=6,
     )
     object_velocity: FloatProperty(default=-1)
@@ -81,7 +81,7 @@ class AnimatedCollectionProperties(PropertyGroup):
         min=0.0001,
         soft_max=1000,
         precision=4,
-        update=clear_preset,
+        update=update_anim_length,
         default=0.1,
     )
 
@@ -175,7 +175,7 @@ class AnimatedCollectionProperties(PropertyGroup):
         min=-1.570796, max=1.570796,
         # min=-0.785398, max=0.785398,
         precision=1, step=20,
-        update=clear_preset,
+        update=update_orient,
         default=(0, 0),
     )
     orient_random: FloatProperty(
@@ -183,7 +183,7 @@ class AnimatedCollectionProperties(PropertyGroup):
         description="Randomize orientation of the bounding box that selects objects for each frame",
         min=0, max=100,
         precision=1,
-        update=clear_preset,
+        update=clear_layer_plan,
         default=0,
     )
 
@@ -200,16 +200,67 @@ class AnimatedCollectionProperties(PropertyGroup):
     inverted_build: BoolProperty(
         name="From other direction",
         description="Invert the animation so that the objects start (dis)assembling from the other side",
-        update=clear_preset,
+        update=update_anim_length,
         default=False,
     )
 
     use_global: BoolProperty(
         name="Use Global Orientation",
         description="Use global object orientation for creating animation (local orientation if disabled)",
+        update=clear_layer_plan,
+        default=False,
+    )
+    random_seed: IntProperty(
+        name="Random Seed",
+        description="Seed for the randomized offsets, orientations and timing of this animation",
+        min=0,
+        update=clear_layer_plan,
+        default=0,
+    )
+    use_fast_keying: BoolProperty(
+        name="Fast Keying",
+        description="Write keyframes in bulk instead of inserting them one at a time (much faster for large collections, and lets 'Update Build Animation' rewrite only the keyframes that changed)",
+        update=clear_preset,
+        default=False,
+    )
+    use_shared_actions: BoolProperty(
+        name="Shared Actions",
+        description="Animate delta transforms, sharing one action between objects in a layer (far fewer actions for large collections). Random offsets are added by drivers on each object's location and rotation",
+        update=clear_preset,
+        default=False,
+    )
+    use_drivers: BoolProperty(
+        name="Use Drivers",
+        description="Animate delta transforms with drivers reading each object's start frame and offset, instead of keyframes (retiming only updates the start frames)",
         update=clear_preset,
         default=False,
     )
+    use_instances: BoolProperty(
+        name="Instance Build",
+        description="Animate instances on the points of a Geometry Nodes instancer instead of objects (the collection's meshes are converted to instances if no instancer is set)",
+        update=clear_layer_plan,
+        default=False,
+    )
+    use_loose_parts: BoolProperty(
+        name="Loose Part Build",
+        description="Animate the loose parts of a single mesh with a Geometry Nodes modifier instead of animating objects",
+        update=clear_layer_plan,
+        default=False,
+    )
+    parts_object: PointerProperty(
+        type=bpy.types.Object,
+        name="Mesh",
+        description="Mesh whose loose parts to animate (defaults to the first mesh in the collection)",
+        poll=instancer_poll,
+        update=clear_layer_plan,
+    )
+    instancer: PointerProperty(
+        type=bpy.types.Object,
+        name="Instancer",
+        description="Mesh whose points to instance the collection's objects on (by the 'instance_index' point attribute, in alphabetical order)",
+        poll=instancer_poll,
+        update=clear_layer_plan,
+    )
     mesh_only: BoolProperty(
         name="Mesh Objects Only",
         description="Non-mesh objects will be excluded from the animation",
@@ -219,26 +270,31 @@ class AnimatedCollectionProperties(PropertyGroup):
     skip_empty_selections: BoolProperty(
         name="Skip Empty Selections",
         description="Skip frames where nothing is selected if checked (Recommended)",
-        update=clear_preset,
+        update=update_anim_length,
         default=True,
     )
 
     # Session properties
-    obj_min_loc: FloatVectorProperty(subtype="XYZ", default=(0, 0, 0))
-    obj_max_loc: FloatVectorProperty(subtype="XYZ", default=(0, 0, 0))
+    obj_min_loc: FloatVectorProperty(subtype="XYZ", update=update_visualizer_bounds, default=(0, 0, 0))
+    obj_max_loc: FloatVectorProperty(subtype="XYZ", update=update_visualizer_bounds, default=(0, 0, 0))
 
     animated: BoolProperty(default=False)
     anim_bounds_start: IntProperty(default=-1)
     anim_bounds_end: IntProperty(default=-1)
     time_created: FloatProperty(default=float("inf"))
+    instance_object: PointerProperty(type=bpy.types.Object)
     cur_preset: StringProperty(default="None")
 
     frame_with_orig_loc: IntProperty(default=-1)
+    plan_stamp: FloatProperty(default=0)
+    plan_hash: StringProperty(default="")
+    plan_data: StringProperty(default="")
+    built_plan_data: StringProperty(default="")
     anim_length: IntProperty(default=0)
     last_layer_velocity: IntProperty(default=-1)
     visualizer_animated: BoolProperty(default=False)
     visualizer_active: BoolProperty(default=False)
-    visualizer_needs_update: BoolProperty(default=False)
+    visualizer_needs_update: BoolProperty(update=handle_visualizer_needs_update, default=False)
 
     last_active_object_name: StringProperty(default="")
     active_user_index: IntProperty(default=0)
@@ -42,6 +42,7 @@ class AssemblMeProperties(PropertyGroup):
         description="Scale of layer orientation visualizer",
         subtype="DISTANCE",
         soft_min=0.1, soft_max=16,
+        update=update_visualizer_lattice,
         default=10,
     )
     visualizer_res: FloatProperty(
@@ -50,5 +51,6 @@ class AssemblMeProperties(PropertyGroup):
         precision=2,
         min=0.001, soft_min=0.05,
         soft_max=1,
+        update=update_visualizer_lattice,
         default=0.25,
     )
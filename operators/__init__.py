@@ -18,8 +18,10 @@
 __all__ = [
     "aglist_actions",
     "create_build_animation",
+    "export_profile",
     "start_over",
     "refresh_build_animation_length",
+    "retime_build_animation",
     "visualizer",
     "presets",
     "new_group_from_selection",
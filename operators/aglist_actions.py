@@ -105,6 +105,9 @@ class AGLIST_OT_list_action(Operator):
             # set item ID to unique number
             item.id = i
             item.idx = len(scn.aglist)-1
+            # new animations use the bulk writer, which 'Update Build Animation' needs to only rewrite changed keyframes
+            # (the property defaults to off, so animations in existing files keep the per-keyframe writer)
+            item.use_fast_keying = True
 
         elif self.action == "DOWN" and idx < len(scn.aglist) - 1:
             scn.aglist.move(scn.aglist_index, scn.aglist_index+1)
@@ -116,6 +119,7 @@ class AGLIST_OT_list_action(Operator):
             scn.aglist_index -= 1
             item.idx = scn.aglist_index
 
+        clear_animation_indices(scn)
         return {"FINISHED"}
 
 # copy settings from current index to all other indices
@@ -250,6 +254,7 @@ class AGLIST_OT_clear_all_items(Operator):
              # reverse range to remove last item first
             for i in range(len(ag)-1,-1,-1):
                 scn.aglist.remove(i)
+            clear_animation_indices(scn)
             self.report({"INFO"}, "All items removed")
 
         else:
@@ -26,6 +26,16 @@ from bpy.types import Operator
 # Module imports
 from ..functions import *
 
+# seconds spent building per modal timer event (the UI is redrawn in between)
+MODAL_TICK_TIME = 0.1
+# events passed through to the viewport while building
+NAVIGATION_EVENTS = {"MIDDLEMOUSE", "WHEELUPMOUSE", "WHEELDOWNMOUSE", "MOUSEMOVE", "TRACKPADPAN", "TRACKPADZOOM", "NDOF_MOTION"}
+
+
+def format_duration(seconds:float):
+    return "%d:%02d" % divmod(int(round(seconds)), 60)
+
+
 class ASSEMBLME_OT_create_build_animation(Operator):
     """Select objects layer by layer and shift by given values"""
     bl_idname = "assemblme.create_build_animation"
@@ -43,29 +53,78 @@ class ASSEMBLME_OT_create_build_animation(Operator):
             return False
         return True
 
+    @profiled_run("Create Build Animation")
     def execute(self, context:Context):
         try:
             scn, ag = get_active_context_info()
-            all_ags_for_collection = [ag0 for ag0 in scn.aglist if ag0 == ag or (ag0.collection == ag.collection and ag0.animated)]
-            all_ags_for_collection.sort(key=lambda x: x.time_created)
             # ensure operation can run
             if not self.is_valid(scn, ag):
                 return {"CANCELLED"}
-            # set frame to frame_with_orig_loc that was created first (all_ags_for_collection are sorted by time created)
-            scn.frame_set(all_ags_for_collection[0].frame_with_orig_loc)
-            # clear animation data from all objects in ag.collection
-            clear_animation(get_anim_objects(ag))
-            # create current animation (and recreate any others for this collection that were cleared)
-            for ag0 in all_ags_for_collection:
-                self.create_anim(scn, ag0)
-            # set current_frame to original current_frame
-            scn.frame_set(self.orig_frame)
-            ag.visualizer_needs_update = True
+            for _ in self.build(scn, ag):
+                pass
         except:
             assemblme_handle_exception()
             return{"CANCELLED"}
         return{"FINISHED"}
 
+    def invoke(self, context:Context, event):
+        # build in chunks of layers between redraws (see 'modal')
+        if bpy.app.background:
+            return self.execute(context)
+        scn, ag = get_active_context_info()
+        if ag.use_instances or ag.use_loose_parts:
+            # these are written in one step, so there's nothing to cancel (or restore) part way
+            return self.execute(context)
+        # profile the whole modal build as one run (closed in 'end_modal')
+        self.profile_run = begin_profile_run("Create Build Animation")
+        try:
+            scn, ag = get_active_context_info()
+            # ensure operation can run
+            if not self.is_valid(scn, ag):
+                end_profile_run(self.profile_run)
+                return {"CANCELLED"}
+            self.snapshot = BuildSnapshot(scn, self.get_ags_for_collection(scn, ag))
+            self.build_steps = self.build(scn, ag)
+        except:
+            end_profile_run(self.profile_run)
+            assemblme_handle_exception()
+            return{"CANCELLED"}
+        self.progress = 0
+        self.start_time = time.time()
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.01, window=context.window)
+        wm.progress_begin(0, 100)
+        wm.modal_handler_add(self)
+        return{"RUNNING_MODAL"}
+
+    def modal(self, context:Context, event):
+        if event.type == "ESC" and event.value == "PRESS":
+            self.rollback(context)
+            self.report({"INFO"}, "Build animation cancelled")
+            return{"CANCELLED"}
+        if event.type != "TIMER":
+            # keep the viewport navigable, but don't allow edits while building
+            return{"PASS_THROUGH"} if event.type in NAVIGATION_EVENTS else {"RUNNING_MODAL"}
+        try:
+            end_time = time.time() + MODAL_TICK_TIME
+            for self.progress in self.build_steps:
+                if time.time() >= end_time:
+                    break
+            else:
+                self.end_modal(context)
+                self.snapshot.free()
+                self.report({"INFO"}, "Build animation created in %s" % format_duration(time.time() - self.start_time))
+                return{"FINISHED"}
+        except:
+            self.rollback(context)
+            assemblme_handle_exception()
+            return{"CANCELLED"}
+        self.update_progress(context)
+        return{"RUNNING_MODAL"}
+
+    def cancel(self, context:Context):
+        self.rollback(context)
+
     ################################################
     # initialization method
 
@@ -76,6 +135,7 @@ class ASSEMBLME_OT_create_build_animation(Operator):
         if ag.collection is not None:
             self.objects_to_move = [obj for obj in get_anim_objects(ag) if not ag.mesh_only or obj.type == "MESH"]
         self.orig_frame = scn.frame_current
+        self.snapshot = None
 
     ###################################################
     # class variables
@@ -85,8 +145,36 @@ class ASSEMBLME_OT_create_build_animation(Operator):
     ###################################################
     # class methods
 
-    @timed_call("Time Elapsed")
-    def create_anim(self, scn:Scene, ag):
+    def build(self, scn:Scene, ag):
+        """ builds the animation for ag, yielding progress (0-1) after each chunk of layers """
+        all_ags_for_collection = self.get_ags_for_collection(scn, ag)
+        prev_plan = get_built_plan(ag)
+        if self.can_update_in_place(ag, all_ags_for_collection, prev_plan):
+            # only rewrite keyframes that changed since the last build
+            with profile_span("create_anim"):
+                yield from self.create_anim(scn, ag, prev_plan)
+        else:
+            # set frame to frame_with_orig_loc that was created first (all_ags_for_collection are sorted by time created)
+            with profile_span("frame_set"):
+                scn.frame_set(all_ags_for_collection[0].frame_with_orig_loc)
+            # clear keyframes of all animations for ag.collection
+            self.capture(get_anim_objects(ag, mesh_only=False))
+            anim_objects = get_anim_objects(ag)
+            with profile_span("clear_animation", objects=len(anim_objects)) as counts:
+                counts["keys"] = clear_build_animations(all_ags_for_collection, anim_objects)
+            # create current animation (and recreate any others for this collection that were cleared)
+            for i, ag0 in enumerate(all_ags_for_collection):
+                with profile_span("create_anim"):
+                    for progress in self.create_anim(scn, ag0):
+                        yield (i + progress) / len(all_ags_for_collection)
+        # set current_frame to original current_frame
+        with profile_span("frame_set"):
+            scn.frame_set(self.orig_frame)
+        ag.visualizer_needs_update = True
+        clear_animation_indices(scn)
+
+    def create_anim(self, scn:Scene, ag, prev_plan:AnimationPlan=None):
+        """ creates (or updates) the animation for ag, yielding progress (0-1) after each chunk of layers """
         print("\ncreating build animation...")
 
         # initialize vars
@@ -96,17 +184,24 @@ class ASSEMBLME_OT_create_build_animation(Operator):
             ag.time_created = time.time()
 
         # set current_frame to a frame where the animation is in it's initial state (if creating, this was done in 'execute')
-        scn.frame_set(ag.frame_with_orig_loc if action == "UPDATE" else ag.first_frame)
+        with profile_span("frame_set"):
+            scn.frame_set(ag.frame_with_orig_loc if action == "UPDATE" else ag.first_frame)
 
         ### BEGIN ANIMATION GENERATION ###
-        # populate self.list_z_values
-        self.list_z_values,rot_x_l,rot_y_l = get_list_z_values(ag, self.objects_to_move)
+        # sort objects into build order
+        if ag.use_loose_parts:
+            self.plan = get_loose_part_animation_plan(ag)
+        elif ag.use_instances:
+            self.plan = get_instance_animation_plan(ag)
+        else:
+            self.plan = get_animation_plan(ag)
+        cache_plan(ag, self.plan)
 
         # set obj_min_loc and obj_max_loc
-        set_bounds_for_visualizer(ag, self.list_z_values)
+        set_bounds_for_visualizer(ag, self.plan)
 
         # calculate how many frames the animation will last
-        ag.anim_length = get_anim_length(ag, self.objects_to_move, self.list_z_values.copy(), ag.layer_height, ag.inverted_build, ag.skip_empty_selections)
+        ag.anim_length = get_anim_length(ag, self.plan)
 
         # set first frame to animate from
         self.cur_frame = ag.first_frame + (ag.anim_length if ag.build_type == "ASSEMBLE" else 0)
@@ -115,7 +210,12 @@ class ASSEMBLME_OT_create_build_animation(Operator):
         ag.frame_with_orig_loc = self.cur_frame
 
         # animate the objects
-        objects_moved, last_frame = animate_objects(ag, self.objects_to_move, self.list_z_values, self.cur_frame, ag.loc_interpolation_mode, ag.rot_interpolation_mode)
+        yield from iter_animate_objects(ag, self.objects_to_move, self.plan, self.cur_frame, ag.loc_interpolation_mode, ag.rot_interpolation_mode, prev_plan, before_write=self.capture)
+        last_frame = get_last_frame(ag, self.plan, self.cur_frame)
+
+        # remember the plan these keyframes were built from (for incremental updates)
+        ag.plan_stamp = time.time()
+        cache_built_plan(ag, self.plan)
 
         # handle case where no object was ever selected (e.g. only camera passed to function).
         if action == "CREATE" and ag.frame_with_orig_loc == last_frame:
@@ -123,7 +223,7 @@ class ASSEMBLME_OT_create_build_animation(Operator):
             if ag.mesh_only:
                 warning_msg += " (Non-mesh objects ignored – see advanced settings)"
             self.report({"WARNING"}, warning_msg)
-            return{"FINISHED"}
+            return
 
         # define animation start and end frames
         ag.anim_bounds_start = ag.first_frame if ag.build_type == "ASSEMBLE" else ag.first_frame
@@ -134,6 +234,50 @@ class ASSEMBLME_OT_create_build_animation(Operator):
             disable_relationship_lines()
             ag.animated = True
 
+    @staticmethod
+    def get_ags_for_collection(scn:Scene, ag):
+        """ returns ag and the other built animations for its collection, sorted by time created """
+        all_ags_for_collection = [ag0 for ag0 in scn.aglist if ag0 == ag or (ag0.collection == ag.collection and ag0.animated)]
+        all_ags_for_collection.sort(key=lambda x: x.time_created)
+        return all_ags_for_collection
+
+    def capture(self, objects:list[Object]):
+        """ snapshot objects before the build changes them (only modal builds can be cancelled) """
+        if self.snapshot is not None:
+            self.snapshot.capture(objects)
+
+    def update_progress(self, context:Context):
+        context.window_manager.progress_update(int(self.progress * 100))
+        elapsed = time.time() - self.start_time
+        eta = "ETA %s" % format_duration(elapsed * (1 - self.progress) / self.progress) if self.progress > 0 else "estimating time left"
+        context.workspace.status_text_set("Building animation: %d%% (%s) – press ESC to cancel" % (self.progress * 100, eta))
+
+    def end_modal(self, context:Context):
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+        end_profile_run(self.profile_run)
+
+    def rollback(self, context:Context):
+        """ undo the partial build (restores animations as they were before invoking) """
+        self.build_steps.close()
+        self.profile_run["cancelled"] = True
+        self.end_modal(context)
+        scn = context.scene
+        self.snapshot.restore()
+        scn.frame_set(self.orig_frame)
+        clear_animation_indices(scn)
+
+    @staticmethod
+    def can_update_in_place(ag, all_ags_for_collection:list, prev_plan:AnimationPlan):
+        """ keyframes can be diffed against the previous build if it is the only animation on its objects """
+        if not ag.animated or not ag.use_fast_keying or prev_plan is None or prev_plan.schedule is None:
+            return False
+        if len(all_ags_for_collection) != 1:
+            return False
+        return set(prev_plan.schedule) == set(get_animated_data_paths(ag))
+
     def is_valid(self, scn:Scene, ag):
         if ag.collection is None:
             self.report({"WARNING"}, "No collection name specified")
@@ -142,21 +286,32 @@ class ASSEMBLME_OT_create_build_animation(Operator):
             self.report({"WARNING"}, "Collection contains no objects!")
             return False
         # check if this would overlap with other animations
-        other_anim_ags = [ag0 for ag0 in scn.aglist if ag0 != ag and ag0.collection == ag.collection and ag0.animated]
+        other_anim_ags = [scn.aglist[i] for i in get_animation_idxs_for_collection(scn, ag.collection) if i != scn.aglist_index and scn.aglist[i].animated]
         for ag1 in other_anim_ags:
             if ag1.anim_bounds_start <= ag.first_frame and ag.first_frame <= ag1.anim_bounds_end:
                 self.report({"WARNING"}, "Animation overlaps with another AssemblMe aninmation for this collection")
                 return False
+        if (ag.use_instances or ag.use_loose_parts) and bpy.app.version < (4, 0, 0):
+            self.report({"WARNING"}, "Instance and loose part builds require Blender 4.0 or later")
+            return False
+        if ag.use_instances and ag.use_loose_parts:
+            self.report({"WARNING"}, "Instance and loose part builds can't be combined")
+            return False
+        if ag.use_loose_parts and get_parts_object(ag) is None:
+            self.report({"WARNING"}, "No mesh to animate the loose parts of")
+            return False
+        if any(ag1.use_instances or ag1.use_loose_parts for ag1 in other_anim_ags + [ag]) and len(other_anim_ags) > 0:
+            self.report({"WARNING"}, "Another animation for this collection conflicts with its instance or loose part build (these can't share a collection)")
+            return False
+        if ag.use_drivers and any(ag1.use_drivers for ag1 in other_anim_ags):
+            self.report({"WARNING"}, "Another animation for this collection uses drivers (only one animation per collection can)")
+            return False
         # make sure no objects in this collection are part of another AssemblMe animation
-        for i in range(len(scn.aglist)):
-            c = scn.aglist[i].collection
-            if i == scn.aglist_index or not scn.aglist[i].animated or c is None or c.name == ag.collection.name:
-                continue
-            for obj in self.objects_to_move:
-                users_collection = obj.users_collection
-                if c in users_collection:
-                    self.report({"ERROR"}, "Some objects in this collection are part of another AssemblMe animation")
-                    return False
+        conflicts = get_conflicting_objects(scn, scn.aglist_index, self.objects_to_move)
+        if len(conflicts) > 0:
+            obj_names = ", ".join("'%s'" % obj.name for obj in conflicts[:3]) + (" and %d more" % (len(conflicts) - 3) if len(conflicts) > 3 else "")
+            self.report({"ERROR"}, "Some objects in this collection are part of another AssemblMe animation: " + obj_names)
+            return False
         return True
 
     #############################################
@@ -0,0 +1,56 @@
+# Copyright (C) 2025 Christopher Gearhart
+# chris@bricksbroughttolife.com
+# http://bricksbroughttolife.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# System imports
+# NONE!
+
+# Blender imports
+import bpy
+from bpy.props import *
+from bpy.types import Operator, Context
+from bpy_extras.io_utils import ExportHelper
+
+# Module imports
+from ..functions import *
+
+
+class ASSEMBLME_OT_export_profile(Operator, ExportHelper):
+    """Save timings of recent AssemblMe operations to a JSON file"""
+    bl_idname = "assemblme.export_profile"
+    bl_label = "Export Performance Profile"
+    bl_options = {"REGISTER"}
+
+    filename_ext = ".json"
+    filter_glob: StringProperty(default="*.json", options={"HIDDEN"})
+
+    ################################################
+    # Blender Operator methods
+
+    @classmethod
+    def poll(cls, context:Context):
+        """ ensures operator can execute (if not, returns false) """
+        return len(profile_history) > 0
+
+    def execute(self, context:Context):
+        try:
+            dump_profile_history(self.filepath)
+            self.report({"INFO"}, "Saved %(num_runs)d profiled runs to '%(filepath)s'" % {"num_runs": len(profile_history), "filepath": self.filepath})
+        except:
+            assemblme_handle_exception()
+            return{"CANCELLED"}
+        return{"FINISHED"}
+
+    #############################################
@@ -55,19 +55,19 @@ class ASSEMBLME_OT_anim_presets(Operator):
             selected_preset = "None"
             if self.action == "CREATE":
                 new_preset_name = make_bash_safe(scn.assemblme.new_preset_name).lower()
-                if new_preset_name + ".py" in filenames:
+                if new_preset_name + ".json" in filenames or new_preset_name + ".py" in filenames:
                     self.report({"WARNING"}, "Preset already exists with this name. Try another name!")
                     return{"CANCELLED"}
                 # write new preset to file
                 self.write_new_preset(new_preset_name)
-                filenames.append(new_preset_name + ".py")
+                filenames.append(new_preset_name + ".json")
                 selected_preset = str(new_preset_name)
                 self.report({"INFO"}, "Successfully added new preset '" + new_preset_name + "'")
                 scn.assemblme.new_preset_name = ""
             elif self.action == "REMOVE":
                 anim_preset_to_delete = make_bash_safe(scn.anim_preset_to_delete).lower()
                 backup_path = os.path.join(path, "backups")
-                filename = anim_preset_to_delete + ".py"
+                filename = anim_preset_to_delete + ".json"
                 filepath = os.path.join(path, filename)
                 backup_filepath = os.path.join(backup_path, filename)
                 if os.path.isfile(filepath):
@@ -76,12 +76,13 @@ class ASSEMBLME_OT_anim_presets(Operator):
                     if os.path.isfile(backup_filepath):
                         os.remove(backup_filepath)
                     os.rename(filepath, backup_filepath)
-                    filenames.remove(anim_preset_to_delete + ".py")
+                    filenames.remove(filename)
                     self.report({"INFO"}, "Successfully removed preset '" + anim_preset_to_delete + "'")
                 else:
                     self.report({"WARNING"}, "Preset '" + anim_preset_to_delete + "' does not exist.")
                     return{"CANCELLED"}
 
+            invalidate_preset_items()
             ag.anim_preset = selected_preset
             scn.anim_preset_to_delete = selected_preset
         except:
@@ -107,29 +108,8 @@ class ASSEMBLME_OT_anim_presets(Operator):
         presets_filepath = get_presets_filepath()
         if not os.path.exists(presets_filepath):
             os.makedirs(presets_filepath)
-        new_preset_path = os.path.join(presets_filepath, preset_name + ".py")
-        f = open(new_preset_path, "w")
-        f.write("import bpy")
-        f.write("\ndef execute():")
-        f.write("\n    scn = bpy.context.scene")
-        f.write("\n    ag = scn.aglist[scn.aglist_index]")
-        f.write("\n    ag.build_speed = " + str(ag.build_speed))
-        f.write("\n    ag.velocity = " + str(round(ag.velocity, 6)))
-        f.write("\n    ag.loc_offset = " + str(vec_round(ag.loc_offset, 6).to_tuple()))
-        f.write("\n    ag.loc_interpolation_mode = '" + ag.loc_interpolation_mode + "'")
-        f.write("\n    ag.loc_random = " + str(round(ag.loc_random, 6)))
-        f.write("\n    ag.rot_offset = " + str(tuple(ag.rot_offset)))
-        f.write("\n    ag.rot_interpolation_mode = '" + ag.rot_interpolation_mode + "'")
-        f.write("\n    ag.rot_random = " + str(round(ag.rot_random, 6)))
-        f.write("\n    ag.orient = " + str(tuple(vec_round(ag.orient, 6))))
-        f.write("\n    ag.orient_random = " + str(round(ag.orient_random, 6)))
-        f.write("\n    ag.layer_height = " + str(round(ag.layer_height, 6)))
-        f.write("\n    ag.build_type = '" + ag.build_type + "'")
-        f.write("\n    ag.inverted_build = " + str(round(ag.inverted_build, 6)))
-        f.write("\n    ag.skip_empty_selections = " + str(ag.skip_empty_selections))
-        f.write("\n    ag.use_global = " + str(ag.use_global))
-        f.write("\n    ag.mesh_only = " + str(ag.mesh_only))
-        f.write("\n    return None")
+        new_preset_path = os.path.join(presets_filepath, preset_name + ".json")
+        write_preset_file(new_preset_path, get_preset_settings_from_ag(ag))
 
     def can_run(self):
         scn = bpy.context.scene
@@ -51,8 +51,8 @@ class ASSEMBLME_OT_refresh_anim_length(Operator):
             scn, ag = get_active_context_info()
 
             if ag.collection:
-                # if objects in ag.collection, populate objects_to_move with them
-                self.objects_to_move = get_anim_objects(ag)
+                # if objects in ag.collection, they are gathered by the planner
+                self.objects_to_move = None
                 # set current_frame to animation start frame
                 self.orig_frame = scn.frame_current
                 bpy.context.scene.frame_set(ag.frame_with_orig_loc)
@@ -60,14 +60,20 @@ class ASSEMBLME_OT_refresh_anim_length(Operator):
                 # else, populate objects_to_move with selected_objects
                 self.objects_to_move = context.selected_objects
 
-            # populate self.list_z_values
-            self.list_z_values,_,_ = get_list_z_values(ag, self.objects_to_move)
+            # sort objects into build order
+            if ag.collection and ag.use_loose_parts:
+                self.plan = get_loose_part_animation_plan(ag)
+            elif ag.collection and ag.use_instances:
+                self.plan = get_instance_animation_plan(ag)
+            else:
+                self.plan = get_animation_plan(ag, self.objects_to_move)
+            cache_plan(ag, self.plan)
 
             # set obj_min_loc and obj_max_loc
-            set_bounds_for_visualizer(ag, self.list_z_values)
+            set_bounds_for_visualizer(ag, self.plan)
 
-            # calculate how many frames the animation will last (depletes self.list_z_values)
-            ag.anim_length = get_anim_length(ag, self.objects_to_move, self.list_z_values, ag.layer_height, ag.inverted_build, ag.skip_empty_selections)
+            # calculate how many frames the animation will last
+            ag.anim_length = get_anim_length(ag, self.plan)
 
             if ag.collection:
                 # set current_frame to original current_frame
@@ -0,0 +1,113 @@
+# Copyright (C) 2025 Christopher Gearhart
+# chris@bricksbroughttolife.com
+# http://bricksbroughttolife.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# System imports
+import time
+
+# Blender imports
+import bpy
+from bpy.types import Operator, Context
+
+# Module imports
+from ..functions import *
+
+class ASSEMBLME_OT_retime_build_animation(Operator):
+    """Move existing keyframes to match the current start frame, step and velocity (without rebuilding the animation)"""
+    bl_idname = "assemblme.retime_build_animation"
+    bl_label = "Retime Build Animation"
+    bl_options = {"REGISTER", "UNDO"}
+
+    ################################################
+    # Blender Operator methods
+
+    @classmethod
+    def poll(cls, context:Context):
+        """ ensures operator can execute (if not, returns false) """
+        scn = bpy.context.scene
+        if scn.aglist_index == -1:
+            return False
+        ag = scn.aglist[scn.aglist_index]
+        if not ag.animated:
+            return False
+        return get_built_plan(ag) is not None
+
+    def execute(self, context:Context):
+        try:
+            scn, ag = get_active_context_info()
+            other_anim_ags = [ag0 for ag0 in scn.aglist if ag0 != ag and ag0.collection == ag.collection and ag0.animated]
+            if len(other_anim_ags) > 0:
+                self.report({"WARNING"}, "Collection has other AssemblMe animations – use 'Update Build Animation' instead")
+                return {"CANCELLED"}
+            self.retime(ag)
+        except:
+            assemblme_handle_exception()
+            return {"CANCELLED"}
+        return {"FINISHED"}
+
+    ###################################################
+    # class methods
+
+    @profiled_run("Retime Build Animation")
+    def retime(self, ag):
+        plan = get_built_plan(ag)
+
+        # get new animation length and bounds for the layers that were built
+        anim_length = get_anim_length_for_steps(ag, plan.num_steps)
+        orig_frame = ag.first_frame + (anim_length if ag.build_type == "ASSEMBLE" else 0)
+        last_frame = get_last_frame(ag, plan, orig_frame)
+
+        # move keyframes from their recorded frames to the new ones
+        for data_path, old_frames in plan.keyed_frames.items():
+            new_frames = get_keyframe_frames(ag, plan, orig_frame, plan.get_jitter(data_path))
+            retimed = set()
+            for i, obj in enumerate(plan.objects):
+                if obj is None:
+                    continue
+                # objects sharing an action (see 'use_shared_actions') only need it retimed once
+                action = get_action(obj)
+                retime_key = (None if action is None else action.name, old_frames[i].tobytes())
+                if retime_key in retimed:
+                    continue
+                retimed.add(retime_key)
+                for fcurve in get_fcurves(obj):
+                    if fcurve.data_path == data_path:
+                        retime_keyframes(fcurve, old_frames[i], new_frames[i], get_keyed_values(plan, data_path, i, fcurve.array_index))
+            plan.keyed_frames[data_path] = new_frames
+            if plan.schedule is not None:
+                _, values, interpolations = plan.schedule[data_path]
+                plan.schedule[data_path] = (new_frames, values, interpolations)
+        if plan.driven:
+            # driven objects only need their start frames updated
+            set_build_timing(plan.objects, get_build_timing(ag, plan))
+        if plan.instancer is not None and ag.instance_object is not None:
+            # so do instancer points (see 'use_instances')
+            set_instance_timing(ag.instance_object, plan.point_idxs, get_build_timing(ag, plan))
+        elif plan.instancer is not None and ag.use_loose_parts and plan.instancer in bpy.data.objects:
+            # or the vertices of loose parts (see 'use_loose_parts')
+            set_loose_part_timing(bpy.data.objects[plan.instancer], plan.point_idxs, get_build_timing(ag, plan))
+
+        # update animation info
+        ag.anim_length = anim_length
+        ag.frame_with_orig_loc = orig_frame
+        ag.anim_bounds_start = ag.first_frame
+        ag.anim_bounds_end = orig_frame if ag.build_type == "ASSEMBLE" else last_frame
+        ag.last_layer_velocity = get_object_velocity(ag)
+        ag.visualizer_needs_update = True
+        ag.plan_stamp = time.time()
+        cache_built_plan(ag, plan)
+
+    #############################################
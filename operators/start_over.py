@@ -63,7 +63,7 @@ class ASSEMBLME_OT_start_over(Operator):
     ###################################################
     # class methods
 
-    @timed_call("Time Elapsed")
+    @profiled_run("Start Over")
     def start_over(self):
         # initialize vars
         scn, ag = get_active_context_info()
@@ -73,22 +73,27 @@ class ASSEMBLME_OT_start_over(Operator):
         all_ags_for_collection = [ag0 for ag0 in scn.aglist if ag0 == ag or (ag0.collection == ag.collection and ag0.animated)]
         all_ags_for_collection.sort(key=lambda x: x.time_created)
         # set frame to frame_with_orig_loc that was created first (all_ags_for_collection are sorted by time created)
-        scn.frame_set(all_ags_for_collection[0].frame_with_orig_loc)
+        with profile_span("frame_set"):
+            scn.frame_set(all_ags_for_collection[0].frame_with_orig_loc)
 
         # clear obj_min_loc and obj_max_loc
         ag.obj_min_loc, ag.obj_max_loc = (0, 0, 0), (0, 0, 0)
 
-        # clear animation data from all objects in 'AssemblMe_all_objects_moved' group/collection
+        # remove keyframes created for all animations of ag.collection
         if ag.collection is not None:
-            print("\nClearing animation data from " + str(len(get_anim_objects(ag))) + " objects.")
-            clear_animation(get_anim_objects(ag))
+            anim_objects = get_anim_objects(ag)
+            print("\nClearing animation data from " + str(len(anim_objects)) + " objects.")
+            with profile_span("clear_animation", objects=len(anim_objects)) as counts:
+                counts["keys"] = clear_build_animations(all_ags_for_collection, anim_objects)
 
         # set current_frame to original current_frame
-        scn.frame_set(self.orig_frame)
+        with profile_span("frame_set"):
+            scn.frame_set(self.orig_frame)
 
         # set all animated groups as not animated
         for ag0 in all_ags_for_collection:
             ag0.animated = False
             ag0.time_created = float("inf")
+        clear_animation_indices(scn)
 
     #############################################
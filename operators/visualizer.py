@@ -36,39 +36,15 @@ class ASSEMBLME_OT_visualizer(Operator):
     # Blender Operator methods
 
     def modal(self, context:Context, event:Event):
-        """ runs as long as visualizer is active """
+        """ runs as long as visualizer is active (updates are applied by property callbacks; see 'update_visualizer') """
         try:
-            if event.type in {"ESC"}:
+            if event.type in {"ESC"} and event.value == "PRESS":
+                self.full_disable(context)
+                return {"CANCELLED"}
+            # if the visualizer has been disabled or another animation is active, stop running modal
+            if not self.enabled():
                 self.full_disable(context)
                 return {"CANCELLED"}
-
-            if event.type == "TIMER":
-                if context.scene.aglist_index == -1:
-                    self.full_disable(context)
-                    return {"CANCELLED"}
-                scn, ag = get_active_context_info()
-                if ag.visualizer_needs_update:
-                    self.create_vis_anim()
-                v_obj = self.visualizer_obj
-                # if the visualizer is has been disabled, stop running modal
-                if not self.enabled():
-                    self.full_disable(context)
-                    return {"CANCELLED"}
-                # if new build animation created, update visualizer animation
-                if self.min_and_max != [ag.obj_min_loc, ag.obj_max_loc]:
-                    self.min_and_max = [ag.obj_min_loc, ag.obj_max_loc]
-                    self.create_vis_anim()
-                # set visualizer object rotation
-                if v_obj.rotation_euler.x != ag.orient[0]:
-                    v_obj.rotation_euler.x = ag.orient[0]
-                if v_obj.rotation_euler.y != ag.orient[1]:
-                    v_obj.rotation_euler.y = ag.orient[1]
-                if v_obj.rotation_euler.z != self.z_orient:
-                    v_obj.rotation_euler.z = ag.orient[0] * (cos(ag.orient[1]) * sin(ag.orient[1]))
-                    self.z_orient = v_obj.rotation_euler.z
-                if scn.assemblme.visualizer_scale != self.visualizer_scale or scn.assemblme.visualizer_res != self.visualizer_res:
-                    self.load_lattice_mesh(context)
-                    v_obj.data.update()
             return {"PASS_THROUGH"}
         except:
             assemblme_handle_exception()
@@ -86,24 +62,19 @@ class ASSEMBLME_OT_visualizer(Operator):
                 self.visualizer_obj.hide_select = True
                 self.visualizer_obj.hide_render = True
                 # create animation for visualizer if build animation exists
-                self.min_and_max = [ag.obj_min_loc, ag.obj_max_loc]
                 if ag.collection is not None:
-                    self.create_vis_anim()
+                    set_visualizer_animation(self.visualizer_obj, ag)
+                set_visualizer_orientation(self.visualizer_obj, ag)
                 # enable visualizer
                 self.enable(context)
-                # initialize self.z_orient for modal
-                self.z_orient = None
-                # create timer for modal
-                wm = context.window_manager
-                self._timer = wm.event_timer_add(0.02, window=context.window)
-                wm.modal_handler_add(self)
+                # listen for ESC (no timer: changes are pushed by property callbacks)
+                context.window_manager.modal_handler_add(self)
         except:
             assemblme_handle_exception()
 
         return{"RUNNING_MODAL"}
 
     def cancel(self, context):
-        context.window_manager.event_timer_remove(self._timer)
         self.full_disable(context)
 
     ################################################
@@ -112,57 +83,18 @@ class ASSEMBLME_OT_visualizer(Operator):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        self.visualizer_obj = bpy.data.objects.get("AssemblMe_visualizer")
-        if self.visualizer_obj is None:
-            # create visualizer object
-            m = bpy.data.meshes.new("AssemblMe_visualizer_m")
-            self.visualizer_obj = bpy.data.objects.new("AssemblMe_visualizer", m)
+        self.visualizer_obj = get_visualizer_obj(create=True)
 
     #############################################
     # class methods
 
-    def create_vis_anim(self):
-        scn, ag = get_active_context_info()
-        ag.visualizer_needs_update = False
-        # if first and last location are the same, keep visualizer stationary
-        if ag.obj_min_loc == ag.obj_max_loc or ag.orient_random > 0.0025:
-            clear_animation(self.visualizer_obj)
-            self.visualizer_obj.location = ag.obj_min_loc
-            ag.visualizer_animated = False
-            return "static"
-        # else, create animation
-        else:
-            # if animation already created, clear it
-            if ag.visualizer_animated:
-                clear_animation(self.visualizer_obj)
-            # set up vars
-            self.visualizer_obj.location = ag.obj_min_loc
-            start_frame = ag.frame_with_orig_loc
-            # insert keyframe and iterate current frame, and set another
-            insert_keyframes(self.visualizer_obj, "location", start_frame)
-            self.visualizer_obj.location = ag.obj_max_loc
-            mult = 1 if ag.build_type == "ASSEMBLE" else -1
-            end_frame = start_frame - (ag.anim_length - ag.last_layer_velocity) * mult
-            insert_keyframes(self.visualizer_obj, "location", end_frame, if_needed=True)
-            ag.visualizer_animated = True
-            set_interpolation(self.visualizer_obj, "loc", "LINEAR")
-
-            return "animated"
-
-    def load_lattice_mesh(self, context:Context):
-        scn = bpy.context.scene
-        visualizer_bm = generate_lattice(Vector((scn.assemblme.visualizer_res, scn.assemblme.visualizer_res, 1)), Vector([scn.assemblme.visualizer_scale]*2 + [1]), offset=Vector((0, 0, 1)))
-        self.visualizer_res = scn.assemblme.visualizer_res
-        self.visualizer_scale = scn.assemblme.visualizer_scale
-        visualizer_bm.to_mesh(self.visualizer_obj.data)
-
     def enable(self, context:Context):
         """ enables visualizer """
         scn, ag = get_active_context_info()
         # alert user that visualizer is enabled
         self.report({"INFO"}, "Visualizer enabled... ('ESC' to disable)")
         # add proper mesh data to visualizer object
-        self.load_lattice_mesh(context)
+        set_visualizer_lattice(self.visualizer_obj, scn)
         # link visualizer object to scene
         safe_link(self.visualizer_obj)
         self.visualizer_obj.hide_set(False)
@@ -187,9 +119,6 @@ class ASSEMBLME_OT_visualizer(Operator):
     @staticmethod
     def enabled():
         """ returns boolean for visualizer linked to scene """
-        if bpy.context.scene.aglist_index == -1:
-            return False
-        ag = get_active_context_info()[1]
-        return ag.visualizer_active
+        return visualizer_enabled(bpy.context.scene)
 
     #############################################
@@ -128,6 +128,9 @@ class ASSEMBLME_PT_actions(Panel):
         if not ag.animated:
             row.active = ag.collection is not None
         row.operator("assemblme.create_build_animation", text="Create Build Animation" if not ag.animated else "Update Build Animation", icon="MOD_BUILD")
+        if ag.animated:
+            row = col.row(align=True)
+            row.operator("assemblme.retime_build_animation", text="Retime", icon="TIME")
         row = col.row(align=True)
         row.operator("assemblme.start_over", text="Start Over", icon="RECOVER_LAST")
         if bpy.data.texts.find("AssemblMe log") >= 0:
@@ -218,6 +221,48 @@ class ASSEMBLME_PT_settings(Panel):
         col.prop(ag, "skip_empty_selections")
         col.prop(ag, "use_global")
         col.prop(ag, "mesh_only")
+        col.prop(ag, "use_fast_keying")
+        row = col.row()
+        row.active = not ag.use_drivers
+        row.prop(ag, "use_shared_actions")
+        col.prop(ag, "use_drivers")
+        col.prop(ag, "use_instances")
+        if ag.use_instances:
+            col.prop(ag, "instancer")
+        col.prop(ag, "use_loose_parts")
+        if ag.use_loose_parts:
+            col.prop(ag, "parts_object")
+        col.prop(ag, "random_seed")
+
+
+class ASSEMBLME_PT_performance(Panel):
+    bl_space_type  = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_label       = "Performance"
+    bl_idname      = "ASSEMBLME_PT_performance"
+    bl_parent_id   = "ASSEMBLME_PT_actions"
+    bl_context     = "objectmode"
+    bl_category    = "AssemblMe"
+    bl_options     = {"DEFAULT_CLOSED"}
+
+    def draw(self, context:Context):
+        layout = self.layout
+        run = get_last_profile_run()
+
+        if run is None:
+            layout.label(text="No operations timed yet")
+            return
+        col = layout.column(align=True)
+        col.label(text="%(name)s: %(time).3fs" % run)
+        for span in run["spans"]:
+            split = col.split(factor=0.6, align=True)
+            split.label(text="   " * span["depth"] + span["name"])
+            split.label(text="%.3fs" % span["time"])
+            if span["counts"]:
+                row = col.row(align=True)
+                row.enabled = False
+                row.label(text="   " * (span["depth"] + 1) + format_counts(span["counts"]))
+        layout.operator("assemblme.export_profile", text="Export JSON", icon="EXPORT")
 
 
 class ASSEMBLME_PT_visualizer_settings(Panel):
@@ -131,7 +131,7 @@ def main():
         # remove unnecessary files/directories
         if demo_version:
             os.remove(join(new_dir_path, "lib", f"{current_dir_name}_purchase_verification.txt"))
-        for filename in ("developer-notes.md", "zip-addon.py", "zip_addon.py", "error_log", ".git", ".gitignore", ".github", "__pycache__", f"{current_dir_name}_updater"):
+        for filename in ("developer-notes.md", "zip-addon.py", "zip_addon.py", "batch-build.py", "benchmark.py", "error_log", ".git", ".gitignore", ".github", "__pycache__", f"{current_dir_name}_updater"):
             filepath = join(new_dir_path, filename)
             if not exists(filepath):
                 continue